@@ -0,0 +1,206 @@
+import asyncio
+from binance import AsyncClient
+from price_service import PriceService
+from rate_limiter import AsyncRateLimitedClient, limiter
+from exchange_filters import filters_cache, is_filter_failure
+from metrics import NULL_METRICS
+from order_executor import AsyncOrderExecutor, OrderStatusUnknown
+from strategy import BUY, SELL, describe
+
+
+class ConcurrencyLimitedClient:
+    """Toma el semáforo en cada petición HTTP, no durante las esperas entre reintentos"""
+
+    def __init__(self, client, semaphore):
+        self.client = client
+        self.semaphore = semaphore
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            async with self.semaphore:
+                return await attr(*args, **kwargs)
+        return call
+
+
+class AsyncBotEngine:
+    """Ejecuta muchas estrategias (una por símbolo) en un único event loop"""
+
+    def __init__(self, api_key, api_secret, sleep_time, max_concurrency=20, max_price_age=None, log_callback=None, client=None, metrics=None, state_store=None, rate_limiter=None, tick_recorder=None):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.sleep_time = sleep_time
+        # Máximo de peticiones HTTP simultáneas sobre la sesión compartida
+        self.max_concurrency = max_concurrency
+        self.log_callback = log_callback
+        self.strategies = {}
+        # Un ticker masivo por ciclo para todos los mercados
+        self.prices = PriceService(max_age=max_price_age or max(1.0, 3 * sleep_time / 1000), log_callback=log_callback)
+        self.client = client  # Cliente asíncrono propio (p. ej. AsyncSimulatedExchange); si no, AsyncClient
+        self.metrics = metrics or NULL_METRICS
+        self.state_store = state_store
+        self.rate_limiter = rate_limiter
+        self.tick_recorder = tick_recorder
+        self.executor = None
+        self.in_flight = set()  # Mercados con una orden en curso
+        self.tasks = set()
+        self.semaphore = None
+        self.running = False
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+        else:
+            print(message)
+
+    def add_strategy(self, strategy):
+        self.strategies[strategy.market] = strategy
+        self.prices.track(strategy.market)
+        saved = self.state_store.restore(strategy.market) if self.state_store else None
+        if saved:
+            strategy.last_buy_price, strategy.martingale_multiplier = saved
+        if saved and saved[0] is not None:
+            self.log(f"[{strategy.market}] Posición recuperada: precio de compra {saved[0]}, multiplicador {saved[1]}")
+
+    def remove_strategy(self, market):
+        self.strategies.pop(market.upper(), None)
+
+    async def call(self, method, **params):
+        """Llama a un endpoint respetando el límite de concurrencia"""
+        async with self.semaphore:
+            return await method(**params)
+
+    async def ensure_filters(self):
+        if filters_cache.is_expired():
+            filters_cache.update(await self.call(self.client.get_exchange_info))
+
+    async def refresh_prices(self):
+        try:
+            with self.metrics.timer('get_price'):
+                async with self.semaphore:
+                    await self.prices.refresh_async(self.client)
+        except Exception as e:
+            self.log(f"Error al obtener precios: {e}")
+
+    async def place_order(self, market, decision):
+        """Envía la orden de mercado correspondiente a la decisión"""
+        stage = 'market_buy' if decision.action == BUY else 'market_sell'
+        try:
+            await self.ensure_filters()
+            with self.metrics.timer('adjust_quantity', market):
+                quantity = filters_cache.get(self.client, market)['scales'].quantity(decision.quantity)
+            with self.metrics.timer(stage, market):
+                order = await self.executor.place(market, decision.action, quantity)
+            self.log(f"[{market}] Orden realizada: {order}")
+            return order
+        except OrderStatusUnknown as e:
+            # Se asume ejecutada: repetirla podría duplicar la posición
+            self.log(f"[{market}] {e}; se asume ejecutada para no duplicarla.")
+            return {'status': 'UNKNOWN', 'clientOrderId': e.client_order_id}
+        except Exception as e:
+            self.log(f"[{market}] Error en la orden: {e}")
+            if is_filter_failure(e):
+                filters_cache.invalidate()
+            return None
+
+    async def step(self, strategy):
+        """Un ciclo de execute_trade para una estrategia"""
+        with self.metrics.timer('execute_trade', strategy.market):
+            await self.trade(strategy)
+
+    async def trade(self, strategy):
+        if strategy.market in self.in_flight:
+            # La decisión anterior todavía no terminó: no decidir sobre un estado a medias
+            return
+        current_price = self.prices.get(strategy.market)
+        if not current_price:
+            self.log(f"[{strategy.market}] Precio desactualizado, no se opera en este ciclo.")
+            return
+        if self.tick_recorder:
+            self.tick_recorder.record(strategy.market, current_price)
+
+        decision = strategy.decide(current_price)
+        if not decision:
+            return
+
+        self.log(f"[{strategy.market}] {describe(decision, strategy.market)}")
+        if decision.action in (BUY, SELL):
+            # La orden sigue en segundo plano; el resto de los mercados no la espera
+            self.in_flight.add(strategy.market)
+            task = asyncio.create_task(self.execute_order(strategy, decision))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        else:
+            self.log(f"[{strategy.market}] Límite de Martingala alcanzado. Reiniciando multiplicador.")
+            await self.apply(strategy, decision, None)
+
+    async def execute_order(self, strategy, decision):
+        try:
+            order = await self.place_order(strategy.market, decision)
+            await self.apply(strategy, decision, order)
+        finally:
+            self.in_flight.discard(strategy.market)
+
+    async def apply(self, strategy, decision, order):
+        """Actualiza la estrategia con el resultado y lo guarda en el diario"""
+        previous_state = (strategy.last_buy_price, strategy.martingale_multiplier)
+        strategy.apply(decision, bool(order))
+        state = (strategy.last_buy_price, strategy.martingale_multiplier)
+        if self.state_store and state != previous_state:
+            try:
+                # El commit agrupado espera al fsync: hacerlo fuera del event loop
+                await asyncio.to_thread(self.state_store.record, strategy.market, *state)
+            except Exception as e:
+                self.log(f"[{strategy.market}] Error guardando estado: {e}")
+
+    async def connect(self):
+        """Prepara el cliente, el semáforo y el ejecutor de órdenes dentro del event loop"""
+        if self.client is None:
+            client = await AsyncClient.create(self.api_key, self.api_secret)
+            self.client = AsyncRateLimitedClient(client, self.rate_limiter or limiter)
+        elif self.rate_limiter:
+            self.client = AsyncRateLimitedClient(self.client, self.rate_limiter)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Una orden trabada en reintentos no retiene el cupo que necesita refresh_prices
+        self.executor = AsyncOrderExecutor(ConcurrencyLimitedClient(self.client, self.semaphore), log_callback=self.log)
+
+    async def cycle(self):
+        """Un ticker masivo y un paso de cada estrategia"""
+        await self.refresh_prices()
+        results = await asyncio.gather(*(self.step(s) for s in list(self.strategies.values())), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.log(f"Error en un ciclo de estrategia: {result}")
+
+    async def run(self):
+        """Ciclo principal: un paso por estrategia en cada vuelta"""
+        await self.connect()
+        self.running = True
+        loop = asyncio.get_running_loop()
+        self.log(f"Iniciando motor con {len(self.strategies)} mercados...")
+        try:
+            while self.running:
+                started = loop.time()
+                await self.cycle()
+                # Descontar la duración del ciclo para mantener la cadencia configurada
+                await asyncio.sleep(max(0, self.sleep_time / 1000 - (loop.time() - started)))
+        finally:
+            if self.tasks:
+                await asyncio.gather(*self.tasks, return_exceptions=True)
+            await self.client.close_connection()
+            if self.tick_recorder:
+                self.tick_recorder.flush()
+            self.log("Motor detenido.")
+
+    def start(self):
+        """Bloquea ejecutando el motor hasta que se llame a stop()"""
+        try:
+            asyncio.run(self.run())
+        except KeyboardInterrupt:
+            self.log("Motor detenido manualmente.")
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,211 @@
+import os
+import sys
+import time
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from quantize import StepScale
+from strategy import MartingaleStrategy, BUY, SELL
+from tick_store import TickStore
+
+BacktestResult = namedtuple('BacktestResult', [
+    'pnl', 'realized_pnl', 'max_drawdown', 'escalations', 'max_exposure',
+    'buys', 'sells', 'resets', 'final_position', 'ticks',
+])
+
+# Columnas de los klines de Binance descargados sin encabezado
+KLINE_COLUMNS = ['open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
+                 'quote_volume', 'trades', 'taker_base', 'taker_quote', 'ignore']
+
+
+def load_prices(path, column=None, start=None, end=None):
+    """Carga (timestamps, precios) de un CSV o Parquet de ticks o klines, o de un símbolo del TickStore"""
+    if os.path.isdir(path):
+        # Directorio de un símbolo grabado por TickRecorder (p. ej. ticks/BTCUSDT)
+        root, symbol = os.path.split(os.path.normpath(path))
+        timestamps, prices = TickStore(root or '.').load(symbol, start, end)
+        return timestamps.astype(np.float64), prices
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+        if df.columns[0].replace('.', '').isdigit():
+            # Klines de Binance sin fila de encabezado
+            df = pd.read_csv(path, header=None, names=KLINE_COLUMNS[:len(df.columns)])
+    if column is None:
+        column = 'price' if 'price' in df.columns else 'close'
+    time_column = next((c for c in ('timestamp', 'open_time', 'time') if c in df.columns), None)
+    df = df.dropna(subset=[column])
+    prices = df[column].to_numpy(dtype=np.float64)
+    timestamps = df[time_column].to_numpy(dtype=np.float64) if time_column else np.arange(len(prices), dtype=np.float64)
+    return timestamps, prices
+
+
+class Portfolio:
+    """Posición y caja simuladas (la caja empieza en 0, el PnL es el patrimonio final)"""
+
+    def __init__(self, fee, lot_step=None):
+        self.fee = fee
+        # Si se indica el stepSize, las cantidades se redondean como lo haría el bot
+        self.lot = StepScale(lot_step) if lot_step else None
+        self.cash = 0.0
+        self.position = 0.0
+        self.cost = 0.0  # Costo de la posición abierta, para el PnL realizado
+        self.realized = 0.0
+
+    def execute(self, decision):
+        """Aplica la orden; devuelve False si no se pudo ejecutar"""
+        quantity = decision.quantity
+        if self.lot and decision.action in (BUY, SELL):
+            quantity = float(self.lot.floor(quantity))
+        if decision.action == BUY:
+            if quantity <= 0:
+                return False
+            spent = quantity * decision.price * (1 + self.fee)
+            self.cash -= spent
+            self.position += quantity
+            self.cost += spent
+        elif decision.action == SELL:
+            # Nunca se vende más de lo que se tiene
+            quantity = min(quantity, self.position)
+            if quantity <= 0:
+                return False
+            received = quantity * decision.price * (1 - self.fee)
+            sold_cost = self.cost * quantity / self.position
+            self.cash += received
+            self.position -= quantity
+            self.cost -= sold_cost
+            self.realized += received - sold_cost
+        return True
+
+
+def new_strategy(params):
+    # 'gates' es una función que crea filtros nuevos: tienen estado y no se comparten entre corridas
+    gates = params['gates']() if params.get('gates') else None
+    return MartingaleStrategy('BACKTEST', params['buy_amount'], params['max_drop_percent'], params['target_increment'],
+                              params['alcista_increment'], params['martingale_limit'], gates)
+
+
+def summarize(prices, cash, position, realized, counts):
+    """Calcula PnL, drawdown y exposición a partir de la caja y la posición en cada tick"""
+    equity = cash + position * prices
+    drawdown = np.maximum.accumulate(equity) - equity
+    return BacktestResult(
+        pnl=float(equity[-1]),
+        realized_pnl=realized,
+        max_drawdown=float(drawdown.max()),
+        escalations=counts['escalations'],
+        max_exposure=float((position * prices).max()),
+        buys=counts['buys'],
+        sells=counts['sells'],
+        resets=counts['resets'],
+        final_position=float(position[-1]),
+        ticks=len(prices),
+    )
+
+
+def record(decision, filled, counts):
+    if decision.action == BUY:
+        if not filled:
+            return
+        counts['buys'] += 1
+        if decision.reason != 'primera':
+            counts['escalations'] += 1
+    elif decision.action == SELL:
+        counts['sells'] += 1
+    else:
+        counts['resets'] += 1
+
+
+def backtest_python(prices, params, fee=0.001, lot_step=None):
+    """Versión de referencia: llama a MartingaleStrategy en cada tick"""
+    prices = np.asarray(prices, dtype=np.float64)
+    strategy = new_strategy(params)
+    portfolio = Portfolio(fee, lot_step)
+    counts = {'buys': 0, 'sells': 0, 'resets': 0, 'escalations': 0}
+    cash = np.empty(len(prices))
+    position = np.empty(len(prices))
+    for i, price in enumerate(prices.tolist()):
+        decision = strategy.decide(price)
+        if decision:
+            filled = portfolio.execute(decision)
+            strategy.apply(decision, filled)
+            record(decision, filled, counts)
+        cash[i] = portfolio.cash
+        position[i] = portfolio.position
+    return summarize(prices, cash, position, portfolio.realized, counts)
+
+
+def next_trigger(prices, start, strategy, chunk):
+    """Primer índice >= start donde strategy.decide devolvería una decisión"""
+    if not strategy.last_buy_price:
+        return start, chunk
+    last = strategy.last_buy_price
+    n = len(prices)
+    while start < n:
+        window = prices[start:start + chunk]
+        # Mismas operaciones que MartingaleStrategy.decide, para obtener los mismos flotantes
+        increment = (window - last) / last
+        drop = (last - window) / last
+        hits = np.flatnonzero((increment >= strategy.target_increment) | (drop >= strategy.max_drop_percent)
+                              | (increment >= strategy.alcista_increment))
+        if hits.size:
+            return start + int(hits[0]), chunk
+        start += chunk
+        chunk = min(chunk * 2, 1 << 20)
+    return n, chunk
+
+
+def backtest_numpy(prices, params, fee=0.001, lot_step=None):
+    """Salta con NumPy de un disparo al siguiente; solo los disparos se evalúan en Python"""
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+    strategy = new_strategy(params)
+    portfolio = Portfolio(fee, lot_step)
+    counts = {'buys': 0, 'sells': 0, 'resets': 0, 'escalations': 0}
+    # Estado de caja/posición vigente desde cada índice en adelante
+    starts, cash_states, position_states = [0], [0.0], [0.0]
+    i, chunk = 0, 1024
+    while i < n:
+        i, chunk = next_trigger(prices, i, strategy, chunk)
+        if i >= n:
+            break
+        decision = strategy.decide(float(prices[i]))
+        filled = portfolio.execute(decision)
+        strategy.apply(decision, filled)
+        record(decision, filled, counts)
+        starts.append(i)
+        cash_states.append(portfolio.cash)
+        position_states.append(portfolio.position)
+        # Tras un disparo se vuelve a buscar en bloques chicos
+        i, chunk = i + 1, 1024
+    lengths = np.diff(np.append(starts, n))
+    cash = np.repeat(cash_states, lengths)
+    position = np.repeat(position_states, lengths)
+    return summarize(prices, cash, position, portfolio.realized, counts)
+
+
+def backtest(prices, params, fee=0.001, engine='numpy', lot_step=None):
+    # Los filtros necesitan ver cada tick: el salto entre disparos de NumPy no sirve
+    if engine == 'python' or params.get('gates'):
+        return backtest_python(prices, params, fee, lot_step)
+    return backtest_numpy(prices, params, fee, lot_step)
+
+
+if __name__ == "__main__":
+    # Uso: python backtest.py precios.csv|ticks/SIMBOLO buy_amount max_drop target alcista martingale_limit
+    _, path, buy_amount, max_drop, target, alcista, limit = sys.argv
+    params = {
+        'buy_amount': float(buy_amount),
+        'max_drop_percent': float(max_drop),
+        'target_increment': float(target),
+        'alcista_increment': float(alcista),
+        'martingale_limit': int(limit),
+    }
+    _, prices = load_prices(path)
+    started = time.perf_counter()
+    result = backtest(prices, params)
+    elapsed = time.perf_counter() - started
+    for field, value in result._asdict().items():
+        print(f"{field}: {value}")
+    print(f"ticks/s: {len(prices) / elapsed:,.0f}")
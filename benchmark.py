@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+from async_engine import AsyncBotEngine
+from backtest import load_prices
+from bot_logic import TradingBot
+from exchange_filters import filters_cache
+from metrics import LatencyHistogram, Metrics
+from order_book import LocalOrderBook
+from simulated_exchange import SimulatedExchange, AsyncSimulatedExchange
+from strategy import MartingaleStrategy
+
+PARAMS = {'buy_amount': 20.0, 'max_drop_percent': 0.02, 'target_increment': 0.02,
+          'alcista_increment': 0.05, 'martingale_limit': 4}
+
+
+def synthetic_prices(ticks, seed=0, start=100.0, volatility=0.003):
+    """Paseo aleatorio log-normal redondeado al tickSize por defecto (0.01)"""
+    rng = np.random.default_rng(seed)
+    return np.round(start * np.exp(np.cumsum(rng.normal(0, volatility, ticks))), 2)
+
+
+def symbol_feeds(symbols, ticks, base_prices=None, seed=0):
+    """Un feed por símbolo: sintético, o el histórico desplazado para que no coincidan"""
+    feeds = {}
+    for k in range(symbols):
+        if base_prices is None:
+            prices = synthetic_prices(ticks, seed + k)
+        else:
+            prices = np.roll(base_prices, k * len(base_prices) // symbols)[:ticks]
+        feeds[f"SYM{k:03d}USDT"] = prices.tolist()
+    return feeds
+
+
+def stage_summaries(metrics):
+    """Une los histogramas de todos los mercados de cada etapa"""
+    stages = {}
+    for (stage, _), histogram in list(metrics.histograms.items()):
+        stages.setdefault(stage, LatencyHistogram()).merge(histogram)
+    return {stage: histogram.summary() for stage, histogram in sorted(stages.items())}
+
+
+def run_sync(feeds, cycles, metrics):
+    """Un TradingBot por símbolo, todos en este hilo y por turnos, como execute_trade en start()"""
+    exchange = SimulatedExchange(prices=feeds, balances={'USDT': 1e12})
+    bots = [TradingBot(symbol, PARAMS['buy_amount'], PARAMS['max_drop_percent'], PARAMS['target_increment'],
+                       PARAMS['alcista_increment'], None, None, 0, PARAMS['martingale_limit'],
+                       log_callback=lambda message: None, client=exchange, metrics=metrics)
+            for symbol in feeds]
+    cycle_latency = LatencyHistogram()
+    started = time.perf_counter()
+    for _ in range(cycles):
+        cycle_started = time.perf_counter()
+        for bot in bots:
+            bot.execute_trade()
+        cycle_latency.observe(time.perf_counter() - cycle_started)
+    return time.perf_counter() - started, cycle_latency, len(exchange.orders)
+
+
+def run_async(feeds, cycles, metrics):
+    """Todas las estrategias en un AsyncBotEngine, esperando las órdenes al final de cada ciclo"""
+    exchange = SimulatedExchange(prices=feeds, balances={'USDT': 1e12})
+    engine = AsyncBotEngine(None, None, 0, max_price_age=3600, log_callback=lambda message: None,
+                            client=AsyncSimulatedExchange(exchange), metrics=metrics)
+    for symbol in feeds:
+        engine.add_strategy(MartingaleStrategy(symbol, PARAMS['buy_amount'], PARAMS['max_drop_percent'],
+                                               PARAMS['target_increment'], PARAMS['alcista_increment'],
+                                               PARAMS['martingale_limit']))
+    cycle_latency = LatencyHistogram()
+
+    async def main():
+        await engine.connect()
+        for _ in range(cycles):
+            cycle_started = time.perf_counter()
+            await engine.cycle()
+            if engine.tasks:
+                await asyncio.gather(*engine.tasks)
+            cycle_latency.observe(time.perf_counter() - cycle_started)
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return time.perf_counter() - started, cycle_latency, len(exchange.orders)
+
+
+def run_scenario(engine, symbols, ticks, base_prices=None, memory=True):
+    feeds = symbol_feeds(symbols, ticks, base_prices)
+    run = run_async if engine == 'async' else run_sync
+    # Los filtros se cachean por proceso: cada escenario usa otro exchange simulado
+    filters_cache.invalidate()
+    metrics = Metrics()
+    elapsed, cycle_latency, orders = run(feeds, ticks, metrics)
+    result = {
+        'engine': engine,
+        'symbols': symbols,
+        'cycles': ticks,
+        'decisions': symbols * ticks,
+        'orders': orders,
+        'seconds': elapsed,
+        'decisions_per_second': symbols * ticks / elapsed,
+        'cycle_latency': cycle_latency.summary(),
+        'stages': stage_summaries(metrics),
+    }
+    if memory:
+        # Pasada aparte: tracemalloc vuelve lento el código que mide
+        filters_cache.invalidate()
+        tracemalloc.start()
+        run(feeds, ticks, Metrics())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_memory_bytes'] = peak
+    return result
+
+
+def book_events(updates, levels=1000, changes=10, seed=0):
+    """Snapshot de levels niveles por lado y diffs aleatorios (incluye borrados e inserciones)"""
+    rng = np.random.default_rng(seed)
+    ticks = np.arange(1, levels + 1)
+    snapshot = {'lastUpdateId': 0,
+                'bids': [[f"{100 - 0.01 * i:.2f}", "1.0"] for i in ticks],
+                'asks': [[f"{100 + 0.01 * i:.2f}", "1.0"] for i in ticks]}
+    events = []
+    for u in range(1, updates + 1):
+        offsets = rng.integers(1, levels + 50, size=(2, changes))
+        qtys = np.where(rng.random((2, changes)) < 0.2, 0.0, rng.random((2, changes)) * 5)
+        events.append({'e': 'depthUpdate', 'U': u, 'u': u,
+                       'b': [[f"{100 - 0.01 * o:.2f}", f"{q:.4f}"] for o, q in zip(offsets[0], qtys[0])],
+                       'a': [[f"{100 + 0.01 * o:.2f}", f"{q:.4f}"] for o, q in zip(offsets[1], qtys[1])]})
+    return snapshot, events
+
+
+def run_order_book(updates, levels=1000, changes=10):
+    """Velocidad de apply_diff y de las consultas que hace el bot antes de cada orden"""
+    snapshot, events = book_events(updates, levels, changes)
+    book = LocalOrderBook('BENCH')
+    book.load_snapshot(snapshot)
+    latency = LatencyHistogram()
+    started = time.perf_counter()
+    for event in events:
+        event_started = time.perf_counter()
+        book.apply_diff(event)
+        latency.observe(time.perf_counter() - event_started)
+    elapsed = time.perf_counter() - started
+    queries = 10000
+    query_started = time.perf_counter()
+    for _ in range(queries):
+        book.split('BUY', 50.0, 0.001)
+    query_elapsed = time.perf_counter() - query_started
+    return {
+        'updates': updates,
+        'levels': levels,
+        'changes_per_update': 2 * changes,
+        'updates_per_second': updates / elapsed,
+        'update_latency': latency.summary(),
+        'splits_per_second': queries / query_elapsed,
+    }
+
+
+def revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                               check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Imprime la variación frente a una corrida anterior; devuelve True si hay regresiones"""
+    previous = {(r['engine'], r['symbols']): r for r in baseline['scenarios']}
+    regression = False
+    for result in results['scenarios']:
+        old = previous.get((result['engine'], result['symbols']))
+        if not old:
+            continue
+        speed = result['decisions_per_second'] / old['decisions_per_second'] - 1
+        p99 = result['cycle_latency']['p99'] / old['cycle_latency']['p99'] - 1 if old['cycle_latency']['p99'] else 0.0
+        slower = speed < -threshold or p99 > threshold
+        regression = regression or slower
+        print(f"{result['engine']:>5} {result['symbols']:>4} símbolos: decisiones/s {speed:+.1%}, "
+              f"p99 del ciclo {p99:+.1%}{'  <-- REGRESIÓN' if slower else ''}")
+    if 'order_book' in results and 'order_book' in baseline:
+        speed = results['order_book']['updates_per_second'] / baseline['order_book']['updates_per_second'] - 1
+        slower = speed < -threshold
+        regression = regression or slower
+        print(f"libro: diffs/s {speed:+.1%}{'  <-- REGRESIÓN' if slower else ''}")
+    return regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de TradingBot / AsyncBotEngine sobre ticks reproducidos")
+    parser.add_argument('--prices', help="CSV, Parquet o directorio del TickStore; si no se indica, ticks sintéticos")
+    parser.add_argument('--symbols', default='1,10,100')
+    parser.add_argument('--ticks', type=int, default=2000, help="Ticks (ciclos) por símbolo")
+    parser.add_argument('--engine', choices=['sync', 'async', 'both'], default='both')
+    parser.add_argument('--no-memory', action='store_true', help="Omitir la pasada con tracemalloc")
+    parser.add_argument('--book-updates', type=int, default=50000, help="Diffs del libro de órdenes (0 = omitir)")
+    parser.add_argument('--output', default='benchmark_resultados.json')
+    parser.add_argument('--baseline', help="JSON de una corrida anterior para comparar")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Variación tolerada antes de marcar regresión")
+    args = parser.parse_args()
+
+    base_prices = load_prices(args.prices)[1] if args.prices else None
+    ticks = min(args.ticks, len(base_prices)) if base_prices is not None else args.ticks
+    engines = ['sync', 'async'] if args.engine == 'both' else [args.engine]
+    results = {
+        'timestamp': time.time(),
+        'revision': revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'prices': args.prices or 'sintético',
+        'params': PARAMS,
+        'scenarios': [],
+    }
+    for engine in engines:
+        for symbols in (int(s) for s in args.symbols.split(',')):
+            result = run_scenario(engine, symbols, ticks, base_prices, memory=not args.no_memory)
+            results['scenarios'].append(result)
+            memory = f", memoria pico {result['peak_memory_bytes'] / 1e6:.1f} MB" if 'peak_memory_bytes' in result else ""
+            print(f"{engine:>5} {symbols:>4} símbolos: {result['decisions_per_second']:,.0f} decisiones/s, "
+                  f"ciclo p50 {result['cycle_latency']['p50'] * 1e3:.3f} ms, p99 {result['cycle_latency']['p99'] * 1e3:.3f} ms, "
+                  f"{result['orders']} órdenes{memory}")
+    if args.book_updates:
+        book = run_order_book(args.book_updates)
+        results['order_book'] = book
+        print(f"libro: {book['updates_per_second']:,.0f} diffs/s ({book['changes_per_update']} niveles por diff), "
+              f"p99 {book['update_latency']['p99'] * 1e6:.1f} µs, {book['splits_per_second']:,.0f} split/s")
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            if compare(results, json.load(f), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
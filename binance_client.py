@@ -1,11 +1,11 @@
-from binance.client import Client
 import os
 from dotenv import load_dotenv
+from exchange import create_client
 
 load_dotenv()
 
-# Configuración del cliente Binance
-client = Client(api_key=os.getenv("APIKEY"), api_secret=os.getenv("SECRET"))
+# Configuración del cliente Binance (EXCHANGE_BACKEND=simulated para pruebas sin red)
+client = create_client(api_key=os.getenv("APIKEY"), api_secret=os.getenv("SECRET"))
 
 def market_buy(symbol, quantity):
     try:
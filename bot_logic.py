@@ -1,10 +1,16 @@
-import math
+import queue
 import time
-from binance.client import Client
+from exchange import create_client
+from order_executor import OrderExecutor, OrderStatusUnknown
+from exchange_filters import filters_cache, is_filter_failure
+from metrics import NULL_METRICS
+from rate_limiter import RateLimitedClient, limiter
+from scheduler import AdaptiveScheduler
+from strategy import MartingaleStrategy, BUY, SELL, describe
 
 
 class TradingBot:
-    def __init__(self, market, buy_amount, max_drop_percent, target_increment, alcista_increment, api_key, api_secret, sleep_time, martingale_limit, log_callback=None):
+    def __init__(self, market, buy_amount, max_drop_percent, target_increment, alcista_increment, api_key, api_secret, sleep_time, martingale_limit, log_callback=None, price_stream=None, stream_timeout=None, price_service=None, client=None, metrics=None, scheduler=None, state_store=None, rate_limiter=None, tick_recorder=None, gates=None, depth_cache=None, max_slippage=0.001, chunk_interval=0.5):
         self.market = market.upper()
         self.buy_amount = buy_amount
         self.max_drop_percent = max_drop_percent
@@ -14,133 +20,282 @@ class TradingBot:
         self.api_secret = api_secret
         self.sleep_time = sleep_time
         self.martingale_limit = martingale_limit
-        self.last_buy_price = None
-        self.martingale_multiplier = 1
+        # Estado de la posición (last_buy_price, martingale_multiplier)
+        self.strategy = MartingaleStrategy(market, buy_amount, max_drop_percent, target_increment, alcista_increment, martingale_limit, gates)
         self.log_callback = log_callback
-        self.client = Client(api_key, api_secret)
+        if client is None:
+            client = create_client(api_key, api_secret)  # Binance o un exchange simulado
+            if getattr(client, 'needs_rate_limit', True):
+                rate_limiter = rate_limiter or limiter  # Presupuesto de peso compartido con los otros bots
+        self.client = RateLimitedClient(client, rate_limiter) if rate_limiter else client
+        # Órdenes con client order id, reintentos y reconciliación si el resultado es incierto
+        self.executor = OrderExecutor(self.client, log_callback=self.log)
+        self.metrics = metrics or NULL_METRICS  # Tiempos por etapa del ciclo
+        # Ajusta la espera entre ciclos según la cercanía a los umbrales y el rate limit
+        self.scheduler = scheduler or AdaptiveScheduler(sleep_time / 1000)
+        self.last_price = None
+        self.state_store = state_store  # Diario de posiciones para sobrevivir reinicios
+        self.tick_recorder = tick_recorder  # Guarda cada precio observado para backtests
+        # Libro local para estimar el deslizamiento y dividir las órdenes grandes de la martingala
+        self.depth_cache = depth_cache
+        self.max_slippage = max_slippage
+        self.chunk_interval = chunk_interval  # Segundos entre partes, para que el libro se reponga
         self.running = False  # Controla si el bot está en ejecución
+        self.restore_state()
+        self.price_stream = price_stream  # Si se indica, el bot opera por ticks en vez de sondear
+        # Segundos sin ticks tras los cuales se vuelve a REST y se reconecta el stream
+        self.stream_timeout = stream_timeout or max(1.0, 3 * sleep_time / 1000)
+        self.price_service = price_service  # PriceService compartido entre bots
+        if price_service:
+            price_service.track(self.market)
+
+    @property
+    def last_buy_price(self):
+        return self.strategy.last_buy_price
+
+    @last_buy_price.setter
+    def last_buy_price(self, value):
+        self.strategy.last_buy_price = value
+
+    @property
+    def martingale_multiplier(self):
+        return self.strategy.martingale_multiplier
+
+    @martingale_multiplier.setter
+    def martingale_multiplier(self, value):
+        self.strategy.martingale_multiplier = value
 
     def log(self, message):
         """Muestra o guarda logs dependiendo de la configuración"""
-        if self.log_callback:
-            self.log_callback(message)
-        else:
-            print(message)
+        with self.metrics.timer('log', self.market):
+            if self.log_callback:
+                self.log_callback(message)
+            else:
+                print(message)
 
     def get_price(self):
         """Obtiene el precio actual del mercado"""
-        try:
-            return float(self.client.get_symbol_ticker(symbol=self.market)['price'])
-        except Exception as e:
-            self.log(f"Error al obtener precio: {e}")
-            return None
+        with self.metrics.timer('get_price', self.market):
+            if self.price_service:
+                price = self.price_service.get(self.market)
+                if price is None:
+                    self.log(f"Precio de {self.market} desactualizado, no se opera en este ciclo.")
+                return price
+            try:
+                price = float(self.client.get_symbol_ticker(symbol=self.market)['price'])
+                self.update_rate_limit()
+                return price
+            except Exception as e:
+                self.log(f"Error al obtener precio: {e}")
+                return None
+
+    def update_rate_limit(self):
+        """Informa al scheduler el peso usado según la última respuesta de Binance"""
+        response = getattr(self.client, 'response', None)
+        used_weight = response.headers.get('x-mbx-used-weight-1m') if response is not None else None
+        if used_weight:
+            self.scheduler.observe_weight(int(used_weight))
 
     def adjust_quantity(self, quantity):
         """Ajusta la cantidad para cumplir con las reglas de Binance"""
+        with self.metrics.timer('adjust_quantity', self.market):
+            try:
+                return filters_cache.get(self.client, self.market)['scales'].quantity(quantity)
+            except Exception as e:
+                self.log(f"Error ajustando cantidad: {e}")
+                return quantity
+
+    def plan_chunks(self, side, quantity):
+        """Partes en que conviene dividir la orden según el libro (una sola si no hay libro)"""
+        if not self.depth_cache:
+            return [quantity]
         try:
-            exchange_info = self.client.get_exchange_info()
-            symbol_info = next(filter(lambda x: x['symbol'] == self.market, exchange_info['symbols']), None)
+            book = self.depth_cache.book(self.market)
+            chunks = book.split(side, quantity, self.max_slippage)
+            # Cada parte tiene que seguir cumpliendo minQty y el nocional mínimo
+            scales = filters_cache.get(self.client, self.market)['scales']
+            while len(chunks) > 1 and not scales.is_tradable(chunks[0], book.mid()):
+                chunks = [quantity / (len(chunks) - 1)] * (len(chunks) - 1)
+            _, slippage, _ = book.estimate(side, chunks[0])
+            if slippage is not None:
+                detail = f" en cada una de {len(chunks)} órdenes" if len(chunks) > 1 else ""
+                self.log(f"Deslizamiento estimado {slippage:.3%}{detail}")
+            return chunks
+        except Exception as e:
+            self.log(f"Error leyendo el libro de órdenes: {e}")
+            return [quantity]
 
-            if not symbol_info:
-                raise Exception(f"Información del mercado no encontrada para {self.market}")
+    def send_order(self, side, quantity):
+        """Envía la orden, en partes si el libro no la absorbe entera dentro de max_slippage"""
+        orders = []
+        for i, chunk in enumerate(self.plan_chunks(side, quantity)):
+            if i:
+                time.sleep(self.chunk_interval)
+            try:
+                orders.append(self.executor.place(self.market, side, self.adjust_quantity(chunk)))
+            except Exception as e:
+                if not orders:
+                    raise
+                # Lo ya ejecutado cuenta como posición abierta
+                self.log(f"Error en la parte {i + 1} de la orden: {e}")
+                break
+        return orders[0] if len(orders) == 1 else orders
 
-            step_size = float(next(filter(lambda f: f['filterType'] == 'LOT_SIZE', symbol_info['filters']))['stepSize'])
-            precision = int(math.log10(1 / step_size))
-            adjusted_quantity = round(quantity, precision)
-            return adjusted_quantity - (adjusted_quantity % step_size)
+    def passes_filters(self, side, quantity):
+        """Verifica minQty y el nocional mínimo antes de enviar; sin filtros o sin precio decide el exchange"""
+        try:
+            scales = filters_cache.get(self.client, self.market)['scales']
         except Exception as e:
-            self.log(f"Error ajustando cantidad: {e}")
-            return quantity
+            self.log(f"Error leyendo los filtros: {e}")
+            return True
+        if self.last_price is None:
+            return True
+        adjusted = scales.quantity(quantity)
+        if scales.is_tradable(adjusted, self.last_price):
+            return True
+        self.log(f"{side} de {adjusted} {self.market} a {self.last_price} no cumple minQty o el nocional mínimo; no se envía.")
+        return False
 
     def market_buy(self, quantity):
         """Realiza una compra de mercado"""
-        try:
-            adjusted_quantity = self.adjust_quantity(quantity)
-            order = self.client.order_market_buy(symbol=self.market, quantity=adjusted_quantity)
-            self.log(f"Compra realizada: {order}")
-            return order
-        except Exception as e:
-            self.log(f"Error en market_buy: {e}")
-            return None
+        with self.metrics.timer('market_buy', self.market):
+            if not self.passes_filters('BUY', quantity):
+                return None
+            try:
+                order = self.send_order('BUY', quantity)
+                self.log(f"Compra realizada: {order}")
+                return order
+            except OrderStatusUnknown as e:
+                # Se asume ejecutada: repetirla podría duplicar la posición
+                self.log(f"{e}; se asume ejecutada para no duplicarla.")
+                return {'status': 'UNKNOWN', 'clientOrderId': e.client_order_id}
+            except Exception as e:
+                self.log(f"Error en market_buy: {e}")
+                if is_filter_failure(e):
+                    # Pasó la verificación local y el exchange la rechazó: los filtros cambiaron
+                    filters_cache.invalidate()
+                return None
 
     def market_sell(self, quantity):
         """Realiza una venta de mercado"""
-        try:
-            adjusted_quantity = self.adjust_quantity(quantity)
-            order = self.client.order_market_sell(symbol=self.market, quantity=adjusted_quantity)
-            self.log(f"Venta realizada: {order}")
-            return order
-        except Exception as e:
-            self.log(f"Error en market_sell: {e}")
-            return None
+        with self.metrics.timer('market_sell', self.market):
+            if not self.passes_filters('SELL', quantity):
+                return None
+            try:
+                order = self.send_order('SELL', quantity)
+                self.log(f"Venta realizada: {order}")
+                return order
+            except OrderStatusUnknown as e:
+                # Se asume ejecutada: repetirla podría duplicar la posición
+                self.log(f"{e}; se asume ejecutada para no duplicarla.")
+                return {'status': 'UNKNOWN', 'clientOrderId': e.client_order_id}
+            except Exception as e:
+                self.log(f"Error en market_sell: {e}")
+                if is_filter_failure(e):
+                    # Pasó la verificación local y el exchange la rechazó: los filtros cambiaron
+                    filters_cache.invalidate()
+                return None
 
-    def execute_trade(self):
+    def execute_trade(self, current_price=None):
         """Ejecuta operaciones de compra o venta según las condiciones"""
-        current_price = self.get_price()
-        if not current_price:
-            return
-
-        # Primera compra si no existe un precio previo
-        if not self.last_buy_price:
-            self.log(f"Comprando {self.market} a {current_price}")
-            quantity = self.buy_amount / current_price
-            order = self.market_buy(quantity)
-            if order:
-                self.last_buy_price = current_price
-            return  # Salir para evitar cálculos de incremento o caída
-
-        # Calcular incremento o caída solo si hay un precio de compra anterior
-        increment = (current_price - self.last_buy_price) / self.last_buy_price
-        drop = (self.last_buy_price - current_price) / self.last_buy_price
-
-        # Verificar incremento para venta
-        if increment >= self.target_increment:
-            self.log(f"Vendiendo {self.market} a {current_price}")
-            quantity = self.buy_amount / self.last_buy_price
-            self.market_sell(quantity)
-            self.last_buy_price = None  # Reiniciar después de vender
-            self.martingale_multiplier = 1  # Reiniciar multiplicador
-            return
-
-        # Verificar caída para compra adicional
-        if drop >= self.max_drop_percent:
-            self.log(f"Comprando más {self.market} a {current_price} debido a caída")
-            if self.martingale_multiplier <= self.martingale_limit:
-                quantity = (self.buy_amount * self.martingale_multiplier) / current_price
-                order = self.market_buy(quantity)
-                if order:
-                    self.martingale_multiplier *= 2
-                    self.last_buy_price = current_price  # Actualizar precio
-            else:
-                self.log("Límite de Martingala alcanzado. Reiniciando multiplicador.")
-                self.martingale_multiplier = 1
-            return
-
-        # Verificar incremento alcista para compra adicional
-        if increment >= self.alcista_increment:
-            self.log(f"Comprando más {self.market} a {current_price} debido a tendencia alcista")
-            if self.martingale_multiplier <= self.martingale_limit:
-                quantity = (self.buy_amount * self.martingale_multiplier) / current_price
-                order = self.market_buy(quantity)
-                if order:
-                    self.martingale_multiplier *= 2
-                    self.last_buy_price = current_price  # Actualizar precio
+        with self.metrics.timer('execute_trade', self.market):
+            if current_price is None:
+                current_price = self.get_price()
+            if not current_price:
+                return
+            self.last_price = current_price
+            if self.tick_recorder:
+                self.tick_recorder.record(self.market, current_price)
+
+            decision = self.strategy.decide(current_price)
+            if not decision:
+                return
+
+            self.log(describe(decision, self.market))
+            order = None
+            if decision.action == BUY:
+                order = self.market_buy(decision.quantity)
+            elif decision.action == SELL:
+                self.market_sell(decision.quantity)
             else:
                 self.log("Límite de Martingala alcanzado. Reiniciando multiplicador.")
-                self.martingale_multiplier = 1
+            previous_state = (self.last_buy_price, self.martingale_multiplier)
+            self.strategy.apply(decision, bool(order))
+            self.save_state(previous_state)
+
+    def restore_state(self):
+        """Recupera la posición abierta guardada antes de un reinicio"""
+        saved = self.state_store.restore(self.market) if self.state_store else None
+        if saved:
+            self.last_buy_price, self.martingale_multiplier = saved
+        if saved and saved[0] is not None:
+            # Tras cada venta el diario guarda (None, 1): eso no es una posición abierta
+            self.log(f"Posición recuperada para {self.market}: precio de compra {self.last_buy_price}, multiplicador {self.martingale_multiplier}")
+
+    def save_state(self, previous_state):
+        """Guarda la posición en el diario si cambió"""
+        state = (self.last_buy_price, self.martingale_multiplier)
+        if self.state_store and state != previous_state:
+            try:
+                self.state_store.record(self.market, *state)
+            except Exception as e:
+                self.log(f"Error guardando estado: {e}")
 
     def start(self):
         """Inicia el ciclo principal del bot"""
         self.running = True
         try:
             self.log("Iniciando bot de trading...")
+            if self.price_stream:
+                self.run_stream()
+                return
+            self.scheduler.reset()
             while self.running:
                 self.execute_trade()
-                time.sleep(self.sleep_time / 1000)
+                distance = self.strategy.distance_to_trigger(self.last_price) if self.last_price else None
+                self.scheduler.wait(distance)
         except KeyboardInterrupt:
             self.log("Bot detenido manualmente.")
+        finally:
+            if self.tick_recorder:
+                # Sin esto se pierden los ticks del último lote sin volcar
+                self.tick_recorder.flush()
+
+    def run_stream(self):
+        """Opera con cada tick del stream; si deja de llegar, sondea por REST y reconecta"""
+        ticks = queue.Queue()
+        self.price_stream.start(lambda price, timestamp: ticks.put(price))
+        fallback = False
+        last_reconnect = time.monotonic()
+        try:
+            while self.running:
+                try:
+                    price = ticks.get(timeout=self.sleep_time / 1000 if fallback else self.stream_timeout)
+                except queue.Empty:
+                    if not fallback:
+                        self.log(f"Sin ticks en {self.stream_timeout}s, usando REST mientras se reconecta el stream.")
+                        fallback = True
+                    if time.monotonic() - last_reconnect >= self.stream_timeout:
+                        self.price_stream.reconnect()
+                        last_reconnect = time.monotonic()
+                    self.execute_trade()
+                    continue
+
+                # Si se acumularon ticks, solo importa el más reciente
+                while True:
+                    try:
+                        price = ticks.get_nowait()
+                    except queue.Empty:
+                        break
+                if fallback:
+                    self.log("Stream recuperado, se deja de sondear por REST.")
+                    fallback = False
+                self.execute_trade(price)
+        finally:
+            self.price_stream.stop()
 
     def stop(self):
         """Detiene el bot"""
         self.running = False
+        self.scheduler.cancel()
         self.log("Bot detenido.")
@@ -0,0 +1,235 @@
+import json
+import os
+import re
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+# Esquema normalizado: una fila por tarifa, con la categoría siempre en la misma columna
+COLUMNAS = ["actividad", "categoria", "PRECIO", "FECHA INICIO", "FECHA FIN"]
+# Columnas tipadas que vienen del snapshot: precio en centavos y fechas como datetime64
+TIPADAS = ["centavos", "inicio", "fin"]
+SIN_PRECIO = -1  # Centavos de una tarifa sin precio legible
+SNAPSHOT = "catalogo.npy"  # Dentro de la carpeta de los CSV, junto a catalogo.json
+VERSION = 1  # Cambiarla obliga a recompilar los snapshots existentes
+
+_cache = {}  # base_path -> (firma, Catalogo)
+_lock = threading.Lock()
+_precio_re = re.compile(r"^\$?\s*([\d.]+)(?:,(\d{1,2}))?$")
+
+
+def leer_csv(ruta):
+    """Lee un CSV en utf-8 y, si falla, en latin1"""
+    try:
+        return pd.read_csv(ruta, encoding="utf-8")
+    except UnicodeDecodeError:
+        return pd.read_csv(ruta, encoding="latin1")
+
+
+def normalizar(df, actividad):
+    """Pasa un CSV de tarifas al esquema común (la primera columna es la categoría)"""
+    df = df.rename(columns=lambda col: col.strip().upper())
+    normalizado = pd.DataFrame({
+        "actividad": actividad,
+        "categoria": df.iloc[:, 0],
+        "PRECIO": df.get("PRECIO"),
+        "FECHA INICIO": df.get("FECHA INICIO"),
+        "FECHA FIN": df.get("FECHA FIN"),
+    }, columns=COLUMNAS)
+    for col in COLUMNAS[1:]:
+        normalizado[col] = normalizado[col].map(lambda v: v.strip() if isinstance(v, str) else v)
+    return normalizado
+
+
+def precio_centavos(texto):
+    """" $170.000,00" -> 17000000; SIN_PRECIO si no se puede leer"""
+    match = _precio_re.match(str(texto).strip())
+    if not match:
+        return SIN_PRECIO
+    entero, decimales = match.groups()
+    return int(entero.replace(".", "")) * 100 + int((decimales or "0").ljust(2, "0"))
+
+
+def formatear_precio(centavos):
+    """17000000 -> "$170.000,00", el formato de los CSV"""
+    if centavos < 0:
+        return None
+    entero, resto = divmod(int(centavos), 100)
+    return f"${entero:,}".replace(",", ".") + f",{resto:02d}"
+
+
+def formatear_fecha(fecha):
+    """datetime64 -> "1/3/2025", como en los CSV"""
+    if np.isnat(fecha):
+        return None
+    fecha = fecha.astype(object)
+    return f"{fecha.day}/{fecha.month}/{fecha.year}"
+
+
+def firma(base_path):
+    """Nombre, mtime y tamaño de cada CSV: si no cambia, el catálogo en memoria sigue valiendo"""
+    with os.scandir(base_path) as entradas:
+        return tuple(sorted((e.name, e.stat().st_mtime_ns, e.stat().st_size)
+                            for e in entradas if e.name.endswith(".csv")))
+
+
+def tabla(df):
+    """Arreglo estructurado ordenado por actividad, categoría y fecha de inicio"""
+    inicio = pd.to_datetime(df["FECHA INICIO"], format="%d/%m/%Y", errors="coerce").to_numpy("datetime64[D]")
+    fin = pd.to_datetime(df["FECHA FIN"], format="%d/%m/%Y", errors="coerce").to_numpy("datetime64[D]")
+    actividades = df["actividad"].astype(str).to_numpy()
+    categorias = df["categoria"].fillna("").astype(str).to_numpy()
+    dtype = np.dtype([
+        ("actividad", f"U{max(1, max(map(len, actividades), default=1))}"),
+        ("categoria", f"U{max(1, max(map(len, categorias), default=1))}"),
+        ("centavos", "i8"),
+        ("inicio", "M8[D]"),
+        ("fin", "M8[D]"),
+    ])
+    filas = np.empty(len(df), dtype=dtype)
+    filas["actividad"] = actividades
+    filas["categoria"] = categorias
+    filas["centavos"] = [precio_centavos(p) for p in df["PRECIO"]]
+    filas["inicio"] = inicio
+    filas["fin"] = fin
+    filas.sort(order=["actividad", "categoria", "inicio"], kind="stable")
+    return filas
+
+
+def desde_tabla(filas):
+    """DataFrame del catálogo: columnas tipadas más las de texto con el formato de los CSV"""
+    df = pd.DataFrame({
+        "actividad": filas["actividad"],
+        "categoria": filas["categoria"],
+        "PRECIO": [formatear_precio(c) for c in filas["centavos"]],
+        "FECHA INICIO": [formatear_fecha(f) for f in filas["inicio"]],
+        "FECHA FIN": [formatear_fecha(f) for f in filas["fin"]],
+        "centavos": filas["centavos"],
+        "inicio": filas["inicio"],
+        "fin": filas["fin"],
+    }, columns=COLUMNAS + TIPADAS)
+    df["categoria"] = df["categoria"].replace("", None)
+    return df
+
+
+class Catalogo:
+    """Tarifas de todas las actividades, con los grupos por actividad ya calculados"""
+
+    def __init__(self, df, originales=None, base_path="csv", filas=None):
+        self.df = df  # Compartido entre reruns y sesiones: no modificar
+        self.filas = filas  # Arreglo estructurado (mapeado a memoria si viene del snapshot)
+        self.base_path = base_path
+        self._originales = originales
+        self._indice = None
+        self.por_actividad = {actividad: grupo for actividad, grupo in df.groupby("actividad", sort=True)}
+        self.actividades = list(self.por_actividad)
+        self._categorias = {actividad: sorted(grupo["categoria"].dropna().unique().tolist())
+                            for actividad, grupo in self.por_actividad.items()}
+
+    @property
+    def originales(self):
+        """actividad -> DataFrame tal como está en el CSV (se leen recién cuando se piden)"""
+        if self._originales is None:
+            self._originales = leer_originales(self.base_path)
+        return self._originales
+
+    @property
+    def indice(self):
+        """IndicePrecios para consultar el precio de una fecha (se arma en el primer uso)"""
+        if self._indice is None:
+            from indice_precios import IndicePrecios
+
+            self._indice = IndicePrecios(self.filas)
+        return self._indice
+
+    def actividad(self, nombre):
+        """Filas de una actividad (vacío si no existe)"""
+        return self.por_actividad.get(nombre, self.df.iloc[0:0])
+
+    def categorias(self, actividad):
+        return self._categorias.get(actividad, [])
+
+    def tarifas(self, actividad, categoria):
+        """Filas de una actividad y categoría"""
+        df_actividad = self.actividad(actividad)
+        return df_actividad[df_actividad["categoria"] == categoria]
+
+
+def leer_originales(base_path="csv"):
+    originales = {}
+    for archivo in sorted(os.listdir(base_path)):
+        if archivo.endswith(".csv"):
+            originales[archivo[:-len(".csv")].strip()] = leer_csv(os.path.join(base_path, archivo))
+    return originales
+
+
+def cargar(base_path="csv"):
+    """Lee y normaliza todos los CSV de la carpeta"""
+    originales = leer_originales(base_path)
+    normalizados = [normalizar(df, actividad) for actividad, df in originales.items()]
+    df = pd.concat(normalizados, ignore_index=True) if normalizados else pd.DataFrame(columns=COLUMNAS)
+    filas = tabla(df)
+    return Catalogo(desde_tabla(filas), originales, base_path, filas)
+
+
+def rutas_snapshot(base_path):
+    ruta = os.path.join(base_path, SNAPSHOT)
+    return ruta, os.path.splitext(ruta)[0] + ".json"
+
+
+def compilar(base_path="csv"):
+    """Compila los CSV a un snapshot .npy mapeable; devuelve el catálogo recién leído"""
+    actual = firma(base_path)
+    catalogo = cargar(base_path)
+    ruta, ruta_meta = rutas_snapshot(base_path)
+    # Primero el arreglo y después la meta: una meta vieja solo provoca otra compilación
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "wb") as f:
+        np.save(f, catalogo.filas)
+    os.replace(temporal, ruta)
+    temporal = f"{ruta_meta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"version": VERSION, "filas": len(catalogo.filas), "firma": actual}, f)
+    os.replace(temporal, ruta_meta)
+    return catalogo
+
+
+def abrir_snapshot(base_path, actual):
+    """Catálogo desde el snapshot si corresponde a la firma actual; None si hay que recompilar"""
+    ruta, ruta_meta = rutas_snapshot(base_path)
+    try:
+        with open(ruta_meta, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != VERSION or tuple(map(tuple, meta["firma"])) != actual:
+            return None
+        filas = np.load(ruta, mmap_mode="r")
+        if len(filas) != meta["filas"]:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    return Catalogo(desde_tabla(filas), base_path=base_path, filas=filas)
+
+
+def obtener_catalogo(base_path="csv"):
+    """Catálogo compartido por el proceso; se vuelve a leer solo si cambió algún CSV"""
+    actual = firma(base_path)
+    with _lock:
+        guardado = _cache.get(base_path)
+        if guardado is None or guardado[0] != actual:
+            catalogo = abrir_snapshot(base_path, actual)
+            if catalogo is None:
+                try:
+                    catalogo = compilar(base_path)
+                except OSError:
+                    catalogo = cargar(base_path)  # Carpeta de solo lectura: sin snapshot
+            _cache[base_path] = (actual, catalogo)
+        return _cache[base_path][1]
+
+
+if __name__ == "__main__":
+    # python catalogo.py [carpeta]: compila el snapshot (por ejemplo, en el despliegue)
+    base_path = sys.argv[1] if len(sys.argv) > 1 else "csv"
+    catalogo = compilar(base_path)
+    print(f"{len(catalogo.filas)} tarifas de {len(catalogo.actividades)} actividades en "
+          f"{rutas_snapshot(base_path)[0]}")
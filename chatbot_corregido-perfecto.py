@@ -1,29 +1,15 @@
 import os
-import pandas as pd
 import streamlit as st
 import urllib.parse
 from fpdf import FPDF
 from dotenv import load_dotenv
+from catalogo import obtener_catalogo, formatear_precio, formatear_fecha
 
 # Cargar variables de entorno
 load_dotenv()
 
-# Leer CSV desde carpeta
-base_path = "csv"
-archivos = [f for f in os.listdir(base_path) if f.endswith(".csv")]
-dataframes = []
-
-for archivo in archivos:
-    ruta = os.path.join(base_path, archivo)
-    try:
-        df = pd.read_csv(ruta, encoding="utf-8")
-    except:
-        df = pd.read_csv(ruta, encoding="latin1")
-    df["actividad"] = archivo.replace(".csv", "").strip()
-    df["columna_categoria"] = df.columns[0]
-    dataframes.append(df)
-
-df_total = pd.concat(dataframes, ignore_index=True)
+# Catálogo de tarifas compartido: se lee una vez por proceso y solo se recarga si cambian los CSV
+catalogo = obtener_catalogo("csv")
 
 # Interfaz Streamlit
 st.set_page_config(page_title="ChatBot Turismo Ushuaia", layout="centered")
@@ -31,7 +17,7 @@ st.title("🧭 Chatbot Excursionese Ushuaia")
 st.markdown("Seleccioná una actividad turística y consultá sus categorías, fechas y precios disponibles.")
 
 # Paso 1: Actividad
-actividades = sorted(df_total["actividad"].unique())
+actividades = catalogo.actividades
 actividad_seleccionada = st.selectbox(
     "1️⃣ Elegí una actividad:",
     ["Seleccioná una actividad..."] + actividades,
@@ -39,10 +25,7 @@ actividad_seleccionada = st.selectbox(
 )
 
 if actividad_seleccionada != "Seleccioná una actividad...":
-    df_actividad = df_total[df_total["actividad"] == actividad_seleccionada]
-    col_cat = df_actividad["columna_categoria"].iloc[0]
-
-    categorias = sorted(df_actividad[col_cat].dropna().unique().tolist())
+    categorias = catalogo.categorias(actividad_seleccionada)
     categoria_seleccionada = st.selectbox(
         "2️⃣ Seleccioná una categoría:",
         ["Seleccioná una categoría..."] + categorias,
@@ -52,13 +35,13 @@ if actividad_seleccionada != "Seleccioná una actividad...":
     if categoria_seleccionada != "Seleccioná una categoría...":
         st.markdown("### 3️⃣ Fechas y precios disponibles:")
 
-        coincidencias = df_actividad[df_actividad[col_cat] == categoria_seleccionada]
+        periodos = catalogo.indice.periodos(actividad_seleccionada, categoria_seleccionada)
         fechas_precios = []
 
-        for _, row in coincidencias.iterrows():
-            precio = row.get("PRECIO", "No disponible")
-            fecha_ini = row.get("FECHA INICIO", "?")
-            fecha_fin = row.get("FECHA FIN", "?")
+        for inicio, fin, centavos in periodos:
+            precio = formatear_precio(centavos) or "No disponible"
+            fecha_ini = formatear_fecha(inicio) or "?"
+            fecha_fin = formatear_fecha(fin) or "?"
             label = f"{fecha_ini} al {fecha_fin} — {precio}"
             fechas_precios.append((label, fecha_ini, fecha_fin, precio))
 
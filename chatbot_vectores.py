@@ -1,42 +1,22 @@
 # chatbot_vectores.py
 
-import os
-import pandas as pd
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from langchain.schema import Document
+from catalogo import obtener_catalogo
+from langchain_openai import ChatOpenAI
 from langchain.chains import RetrievalQA
-from langchain.text_splitter import CharacterTextSplitter
+from embeddings import obtener_embeddings
+from indice_vectorial import obtener_indice
 
 # Cargar la API Key desde .env
 load_dotenv()
 
-# Paso 1: Leer todos los CSV y convertir a texto unificado
-base_path = "csv"
-archivos = os.listdir(base_path)
-texto_total = ""
+# Paso 1: Catálogo de tarifas compartido
+catalogo = obtener_catalogo("csv")
 
-for archivo in archivos:
-    if archivo.endswith(".csv"):
-        ruta = os.path.join(base_path, archivo)
-        try:
-            df = pd.read_csv(ruta, encoding="utf-8")
-        except:
-            df = pd.read_csv(ruta, encoding="latin1")
-
-        texto = f"\n--- {archivo.replace('.csv','')} ---\n"
-        texto += df.fillna("").to_string(index=False)
-        texto_total += texto + "\n"
-
-# Paso 2: Dividir el texto en fragmentos (chunks)
-splitter = CharacterTextSplitter(separator="\n", chunk_size=1000, chunk_overlap=100)
-fragmentos = splitter.split_text(texto_total)
-documentos = [Document(page_content=f) for f in fragmentos]
-
-# Paso 3: Crear los embeddings e índice FAISS
-embedding = OpenAIEmbeddings()
-vectorstore = FAISS.from_documents(documentos, embedding)
+# Paso 2: Índice FAISS en disco (indice_faiss/); cada CSV se parte por separado en fragmentos (chunks)
+# Paso 3: Solo se calculan los embeddings de los fragmentos nuevos o modificados
+embedding = obtener_embeddings()  # EMBEDDINGS_BACKEND=openai|local|hashing, con caché en disco
+vectorstore = obtener_indice(catalogo, embedding)
 retriever = vectorstore.as_retriever()
 
 # Paso 4: Crear el LLM (modelo de lenguaje)
@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from dotenv import load_dotenv
+from bot_logic import TradingBot
+from exchange import create_client
+from indicators import build_gates
+from log_channel import LogChannel
+from metrics import Metrics, PrometheusFileSink
+from rate_limiter import limiter
+from state_store import StateStore
+
+DEFAULT_SOCKET = "/tmp/tdfbot.sock"
+# Parámetros de TradingBot que se leen de cada entrada de "bots" (o de "defaults")
+BOT_PARAMS = ('market', 'buy_amount', 'max_drop_percent', 'target_increment', 'alcista_increment',
+              'sleep_time', 'martingale_limit')
+
+# Ejemplo de configuración (los secretos nunca van en el archivo, solo el nombre de la variable):
+# {
+#   "socket": "/tmp/tdfbot.sock",
+#   "log_file": "tdfbot.jsonl",
+#   "state_db": "bot_state.db",
+#   "defaults": {"sleep_time": 1000, "martingale_limit": 4, "api_key_env": "APIKEY", "api_secret_env": "SECRET"},
+#   "bots": [
+#     {"name": "shib", "market": "SHIBUSDT", "buy_amount": 10, "max_drop_percent": 0.02,
+#      "target_increment": 0.03, "alcista_increment": 0.05},
+#     {"name": "doge", "market": "DOGEUSDT", "buy_amount": 15, "max_drop_percent": 0.03,
+#      "target_increment": 0.04, "alcista_increment": 0.06, "autostart": false,
+#      "gates": [{"type": "trend", "fast": 12, "slow": 26}, {"type": "volatility", "window": 60, "max_volatility": 0.01}]}
+#   ]
+# }
+
+
+def load_config(path):
+    """Lee el JSON y completa cada bot con los valores de "defaults" """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    defaults = config.get('defaults', {})
+    bots = {}
+    for entry in config.get('bots', []):
+        bot = dict(defaults, **entry)
+        bot.setdefault('name', bot.get('market', '').lower())
+        missing = [p for p in BOT_PARAMS if p not in bot]
+        if missing:
+            raise ValueError(f"Faltan parámetros en el bot {bot['name']}: {', '.join(missing)}")
+        if bot['name'] in bots:
+            raise ValueError(f"Nombre de bot repetido: {bot['name']}")
+        bots[bot['name']] = bot
+    config['bots'] = bots
+    return config
+
+
+class BotDaemon:
+    """Ejecuta varios TradingBot sin interfaz gráfica; se controla por un socket Unix"""
+
+    def __init__(self, config_path):
+        self.config_path = config_path
+        self.config = load_config(config_path)
+        self.socket_path = self.config.get('socket', DEFAULT_SOCKET)
+        self.log_channel = LogChannel(file_path=self.config.get('log_file'))
+        self.state_store = StateStore(self.config.get('state_db', "bot_state.db"))
+        self.metrics = None
+        if self.config.get('metrics_file'):
+            self.metrics = Metrics([PrometheusFileSink(self.config['metrics_file'])])
+            self.metrics.start_export(self.config.get('metrics_interval', 10))
+            limiter.metrics = self.metrics  # El limitador es del proceso: su gauge va al mismo exportador
+        self.bots = {}  # nombre -> (TradingBot, hilo, hora de inicio)
+        self.lock = threading.Lock()
+        self.server = None
+        self.stopping = threading.Event()
+
+    def log(self, message, source=None):
+        self.log_channel.put(f"[{source}] {message}" if source else message, source)
+
+    def print_logs(self):
+        """Vuelca los logs a stdout (journald/docker los recogen de ahí)"""
+        while not self.stopping.is_set():
+            for message in self.log_channel.drain():
+                print(message, flush=True)
+            self.log_channel.flush()
+            self.stopping.wait(0.2)
+        for message in self.log_channel.drain():
+            print(message, flush=True)
+
+    def create_bot(self, name):
+        spec = self.config['bots'][name]
+        api_key = os.getenv(spec.get('api_key_env', "APIKEY"))
+        api_secret = os.getenv(spec.get('api_secret_env', "SECRET"))
+        if not api_key or not api_secret:
+            self.log("Sin credenciales en el entorno: solo funcionarán los endpoints públicos.", name)
+        client = create_client(api_key, api_secret, backend=spec.get('backend'), **spec.get('backend_options', {}))
+        return TradingBot(
+            **{p: spec[p] for p in BOT_PARAMS},
+            api_key=api_key,
+            api_secret=api_secret,
+            log_callback=lambda message: self.log(message, name),
+            client=client,
+            gates=build_gates(spec.get('gates')),
+            metrics=self.metrics,
+            state_store=self.state_store,
+            # Presupuesto de peso compartido por todos los bots del host (los simulados no lo consumen)
+            rate_limiter=limiter if getattr(client, 'needs_rate_limit', True) else None,
+        )
+
+    def start_bot(self, name):
+        with self.lock:
+            if name not in self.config['bots']:
+                raise KeyError(f"Bot desconocido: {name}")
+            running = self.bots.get(name)
+            if running and running[1].is_alive():
+                # Un bot detenido cuyo hilo no terminó sigue operando el mercado y el diario
+                if not running[0].running:
+                    return f"{name} todavía se está deteniendo; no se inicia otro"
+                return f"{name} ya está en ejecución"
+            bot = self.create_bot(name)
+            thread = threading.Thread(target=bot.start, name=f"bot-{name}", daemon=True)
+            self.bots[name] = (bot, thread, time.time())
+            thread.start()
+        return f"{name} iniciado"
+
+    def stop_bot(self, name, timeout=30):
+        with self.lock:
+            running = self.bots.get(name)
+        if not running:
+            return f"{name} no está en ejecución"
+        bot, thread, _ = running
+        bot.stop()
+        thread.join(timeout)
+        if thread.is_alive():
+            # Se conserva la entrada para que start/restart no lancen un segundo bot sobre el mismo mercado
+            return f"{name} no terminó en {timeout} s"
+        with self.lock:
+            if self.bots.get(name) is running:
+                del self.bots[name]
+        return f"{name} detenido"
+
+    def restart_bot(self, name):
+        result = self.stop_bot(name)
+        with self.lock:
+            running = self.bots.get(name)
+        if running and running[1].is_alive():
+            return result, f"{name} no se reinicia mientras siga en ejecución"
+        return result, self.start_bot(name)
+
+    def status(self):
+        with self.lock:
+            running = dict(self.bots)
+        result = {}
+        for name, spec in self.config['bots'].items():
+            entry = {'market': spec['market'], 'running': False}
+            if name in running:
+                bot, thread, started = running[name]
+                entry.update(running=thread.is_alive(), uptime=time.time() - started, last_price=bot.last_price,
+                             last_buy_price=bot.last_buy_price, martingale_multiplier=bot.martingale_multiplier)
+            result[name] = entry
+        return result
+
+    def reload(self):
+        """Relee la configuración; los bots en ejecución siguen con sus parámetros hasta reiniciarlos"""
+        config = load_config(self.config_path)
+        with self.lock:
+            self.config['bots'] = config['bots']
+        return f"{len(config['bots'])} bots en la configuración"
+
+    def names(self, target):
+        return list(self.config['bots']) if target in (None, 'all') else [target]
+
+    def handle(self, request):
+        """Ejecuta un comando del socket: {"cmd": "start"|"stop"|"restart"|"status"|"reload"|"shutdown", "bot": nombre|"all"}"""
+        cmd, target = request.get('cmd'), request.get('bot')
+        if cmd == 'status':
+            return self.status()
+        if cmd == 'start':
+            return [self.start_bot(name) for name in self.names(target)]
+        if cmd == 'stop':
+            names = list(self.bots) if target in (None, 'all') else [target]
+            return [self.stop_bot(name) for name in names]
+        if cmd == 'restart':
+            return [self.restart_bot(name) for name in self.names(target)]
+        if cmd == 'reload':
+            return self.reload()
+        if cmd == 'shutdown':
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return "apagando"
+        raise ValueError(f"Comando desconocido: {cmd}")
+
+    def serve(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = {'ok': True, 'result': daemon.handle(json.loads(line))}
+                    except Exception as e:
+                        response = {'ok': False, 'error': str(e)}
+                    self.wfile.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Socket de una ejecución anterior
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self.server.daemon_threads = True
+        os.chmod(self.socket_path, 0o600)  # Solo el usuario del daemon puede controlar los bots
+        self.server.serve_forever()
+
+    def run(self):
+        threading.Thread(target=self.print_logs, daemon=True).start()
+        self.log(f"Daemon iniciado con {len(self.config['bots'])} bots, socket {self.socket_path}")
+        for name, spec in self.config['bots'].items():
+            if spec.get('autostart', True):
+                self.start_bot(name)
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=self.shutdown, daemon=True).start())
+        try:
+            self.serve()
+        except KeyboardInterrupt:
+            self.shutdown()
+        finally:
+            self.cleanup()
+
+    def shutdown(self):
+        for name in list(self.bots):
+            self.log(self.stop_bot(name))
+        if self.server:
+            self.server.shutdown()
+
+    def cleanup(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.state_store.close()
+        if self.metrics:
+            self.metrics.stop_export()
+        self.log("Daemon detenido.")
+        self.stopping.set()
+        self.log_channel.close()
+
+
+def send(socket_path, request, timeout=60):
+    """Envía un comando al daemon y devuelve la respuesta"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with sock.makefile(encoding="utf-8") as f:
+            return json.loads(f.readline())
+
+
+if __name__ == "__main__":
+    # python daemon.py run bots.json | python daemon.py status | python daemon.py stop shib
+    parser = argparse.ArgumentParser(description="TradingBot sin interfaz gráfica")
+    parser.add_argument('cmd', choices=['run', 'start', 'stop', 'restart', 'status', 'reload', 'shutdown'])
+    parser.add_argument('target', nargs='?', help="Archivo de configuración (run) o nombre del bot / all")
+    parser.add_argument('--socket', default=os.getenv("TDFBOT_SOCKET", DEFAULT_SOCKET))
+    args = parser.parse_args()
+    if args.cmd == 'run':
+        load_dotenv()
+        BotDaemon(args.target or "bots.json").run()
+    else:
+        response = send(args.socket, {'cmd': args.cmd, 'bot': args.target})
+        print(json.dumps(response.get('result', response.get('error')), indent=2, ensure_ascii=False))
+        sys.exit(0 if response.get('ok') else 1)
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+import numpy as np
+
+try:
+    from langchain_core.embeddings import Embeddings
+except ImportError:  # Sin langchain los embedders igual sirven para medir con numpy
+    Embeddings = object
+
+
+def modelo_de(embedding):
+    """Identifica el modelo: si cambia, los vectores guardados no sirven"""
+    identificador = getattr(embedding, 'identificador', None)
+    if identificador:
+        return identificador
+    return f"{type(embedding).__name__}:{getattr(embedding, 'model', '') or getattr(embedding, 'model_name', '')}"
+
+
+def sin_acentos(texto):
+    return "".join(c for c in unicodedata.normalize("NFKD", texto.lower()) if not unicodedata.combining(c))
+
+
+class HashingEmbeddings(Embeddings):
+    """Embeddings locales y deterministas: palabras, pares de palabras y trigramas hasheados a dimension columnas"""
+
+    def __init__(self, dimension=512):
+        self.dimension = dimension
+        self.identificador = f"hashing:{dimension}"
+
+    def columnas(self, rasgo):
+        valor = int.from_bytes(hashlib.blake2b(rasgo.encode("utf-8"), digest_size=8).digest(), "little")
+        return valor % self.dimension, 1.0 if valor >> 63 else -1.0
+
+    def vector(self, texto):
+        palabras = sin_acentos(texto).split()
+        rasgos = palabras + [f"{a} {b}" for a, b in zip(palabras, palabras[1:])]
+        for palabra in palabras:
+            relleno = f"#{palabra}#"
+            rasgos.extend(relleno[i:i + 3] for i in range(len(relleno) - 2))
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for rasgo in rasgos:
+            columna, signo = self.columnas(rasgo)
+            vector[columna] += signo
+        vector = np.sign(vector) * np.log1p(np.abs(vector))  # Frecuencia amortiguada
+        norma = np.linalg.norm(vector)
+        return vector / norma if norma else vector
+
+    def embed_documents(self, texts):
+        return [self.vector(texto).tolist() for texto in texts]
+
+    def embed_query(self, text):
+        return self.vector(text).tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """Envuelve otro backend y guarda cada vector en SQLite por hash del texto; solo se calculan los que faltan"""
+
+    def __init__(self, base, path="embeddings_cache.db", batch_size=64):
+        self.base = base
+        self.identificador = modelo_de(base)  # El caché no cambia el modelo del índice
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # Perder la última escritura solo cuesta recalcularla
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                modelo TEXT NOT NULL,
+                clave TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (modelo, clave)
+            ) WITHOUT ROWID""")
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def clave(texto):
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def buscar(self, claves):
+        encontrados = {}
+        unicas = list(dict.fromkeys(claves))
+        with self.lock:
+            for i in range(0, len(unicas), 500):  # Debajo del límite de parámetros de SQLite
+                parte = unicas[i:i + 500]
+                filas = self.conn.execute(
+                    f"SELECT clave, vector FROM embeddings WHERE modelo = ? AND clave IN ({','.join('?' * len(parte))})",
+                    [self.identificador, *parte]).fetchall()
+                encontrados.update((clave, np.frombuffer(vector, dtype=np.float32).tolist()) for clave, vector in filas)
+        return encontrados
+
+    def guardar(self, pares):
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany("INSERT OR REPLACE INTO embeddings (modelo, clave, vector) VALUES (?, ?, ?)",
+                                  [(self.identificador, clave, np.asarray(vector, dtype=np.float32).tobytes())
+                                   for clave, vector in pares])
+            self.conn.execute("COMMIT")
+
+    def embed_documents(self, texts):
+        claves = [self.clave(texto) for texto in texts]
+        vectores = self.buscar(claves)
+        faltantes = list(dict.fromkeys(clave for clave in claves if clave not in vectores))
+        self.hits += len(texts) - len(faltantes)
+        self.misses += len(faltantes)
+        textos = {clave: texto for clave, texto in zip(claves, texts)}
+        for i in range(0, len(faltantes), self.batch_size):
+            lote = faltantes[i:i + self.batch_size]
+            calculados = self.base.embed_documents([textos[clave] for clave in lote])
+            self.guardar(zip(lote, calculados))
+            vectores.update(zip(lote, calculados))
+        return [vectores[clave] for clave in claves]
+
+    def embed_query(self, text):
+        clave = self.clave(text)
+        vector = self.buscar([clave]).get(clave)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        vector = self.base.embed_query(text)
+        self.guardar([(clave, vector)])
+        return vector
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def openai_backend(**options):
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(**options)
+
+
+def local_backend(**options):
+    # Modelo de sentence-transformers en CPU; se descarga una vez y después funciona sin red
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    options.setdefault('model_name', os.getenv("EMBEDDINGS_MODEL", "sentence-transformers/all-MiniLM-L6-v2"))
+    return HuggingFaceEmbeddings(**options)
+
+
+def hashing_backend(**options):
+    return HashingEmbeddings(**options)
+
+
+# Backends disponibles; se pueden agregar otros con register_backend
+BACKENDS = {
+    'openai': openai_backend,
+    'local': local_backend,
+    'hashing': hashing_backend,  # Sin red ni modelo: para pruebas y benchmarks
+}
+
+
+def register_backend(name, factory):
+    BACKENDS[name] = factory
+
+
+def crear_embeddings(backend=None, cache=None, **options):
+    """Embedder de la variable EMBEDDINGS_BACKEND (u OpenAI), con caché en EMBEDDINGS_CACHE ("" lo desactiva)"""
+    backend = backend or os.getenv("EMBEDDINGS_BACKEND", "openai")
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de embeddings desconocido: {backend}")
+    embedding = BACKENDS[backend](**options)
+    cache = os.getenv("EMBEDDINGS_CACHE", "embeddings_cache.db") if cache is None else cache
+    return CachedEmbeddings(embedding, cache) if cache else embedding
+
+
+_embedders = {}  # (backend, caché, opciones) -> embedder compartido por el proceso
+_embedders_lock = threading.Lock()
+
+
+def obtener_embeddings(backend=None, cache=None, **options):
+    """Como crear_embeddings, pero un solo embedder por configuración: Streamlit lo reutiliza entre reruns"""
+    backend = backend or os.getenv("EMBEDDINGS_BACKEND", "openai")
+    cache = os.getenv("EMBEDDINGS_CACHE", "embeddings_cache.db") if cache is None else cache
+    clave = (backend, cache, tuple(sorted((k, repr(v)) for k, v in options.items())))
+    with _embedders_lock:
+        if clave not in _embedders:
+            _embedders[clave] = crear_embeddings(backend, cache, **options)
+        return _embedders[clave]
+
+
+if __name__ == "__main__":
+    # python embeddings.py [backend]: tiempos de embeddings y búsqueda sobre el catálogo, sin LLM
+    from catalogo import obtener_catalogo
+
+    catalogo = obtener_catalogo("csv")
+    df = catalogo.df
+    textos = [f"{actividad} {categoria} {precio} del {inicio} al {fin}" for actividad, categoria, precio, inicio, fin
+              in zip(df["actividad"], df["categoria"], df["PRECIO"], df["FECHA INICIO"], df["FECHA FIN"])]
+    consultas = [f"precio {actividad.lower()} adulto" for actividad in catalogo.actividades]
+    ruta = "embeddings_benchmark.db"
+    if os.path.exists(ruta):
+        os.remove(ruta)
+    embedding = crear_embeddings(sys.argv[1] if len(sys.argv) > 1 else "hashing", cache=ruta)
+    for pasada in ("sin caché", "con caché"):
+        inicio = time.perf_counter()
+        matriz = np.asarray(embedding.embed_documents(textos), dtype=np.float32)
+        print(f"{len(textos)} documentos {pasada}: {time.perf_counter() - inicio:.3f} s")
+    inicio = time.perf_counter()
+    vectores = np.asarray([embedding.embed_query(consulta) for consulta in consultas], dtype=np.float32)
+    mejores = np.argmax(vectores @ matriz.T, axis=1)
+    transcurrido = time.perf_counter() - inicio
+    aciertos = sum(textos[i].startswith(a) for i, a in zip(mejores, catalogo.actividades))
+    print(f"{len(consultas)} consultas: {transcurrido / len(consultas) * 1e3:.2f} ms por consulta, "
+          f"{aciertos}/{len(consultas)} encuentran su actividad")
+    embedding.close()
+    os.remove(ruta)
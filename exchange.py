@@ -0,0 +1,38 @@
+import os
+
+
+def binance_backend(api_key=None, api_secret=None, **options):
+    from binance.client import Client
+    # Sin timeout una petición colgada bloquearía al bot indefinidamente
+    options.setdefault('requests_params', {'timeout': 10})
+    return Client(api_key, api_secret, **options)
+
+
+def simulated_backend(api_key=None, api_secret=None, **options):
+    from simulated_exchange import SimulatedExchange
+    return SimulatedExchange(**options)
+
+
+def paper_backend(api_key=None, api_secret=None, **options):
+    from paper_trading import paper_backend
+    return paper_backend(api_key, api_secret, **options)
+
+
+# Backends disponibles; se pueden agregar otros con register_backend
+BACKENDS = {
+    'binance': binance_backend,
+    'simulated': simulated_backend,
+    'paper': paper_backend,  # Precios reales, ejecuciones simuladas
+}
+
+
+def register_backend(name, factory):
+    BACKENDS[name] = factory
+
+
+def create_client(api_key=None, api_secret=None, backend=None, **options):
+    """Crea el cliente del exchange; por defecto el de la variable EXCHANGE_BACKEND o Binance"""
+    backend = backend or os.getenv("EXCHANGE_BACKEND", "binance")
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de exchange desconocido: {backend}")
+    return BACKENDS[backend](api_key, api_secret, **options)
@@ -0,0 +1,71 @@
+import threading
+import time
+from quantize import SymbolScales
+
+
+# Códigos de error de Binance que indican que una orden violó un filtro del símbolo
+FILTER_FAILURE_CODES = (-1013,)
+
+
+class ExchangeFiltersCache:
+    """Cache compartida de filtros por símbolo (LOT_SIZE, PRICE_FILTER, MIN_NOTIONAL)"""
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self.filters = {}
+        self.loaded_at = None
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def is_expired(self):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > self.ttl
+
+    def update(self, exchange_info):
+        """Indexa por símbolo el resultado de get_exchange_info"""
+        filters = {}
+        for symbol_info in exchange_info['symbols']:
+            by_type = {f['filterType']: f for f in symbol_info['filters']}
+            # Binance renombró MIN_NOTIONAL a NOTIONAL en algunos mercados
+            notional = by_type.get('MIN_NOTIONAL') or by_type.get('NOTIONAL')
+            symbol_filters = {
+                'LOT_SIZE': by_type.get('LOT_SIZE'),
+                'PRICE_FILTER': by_type.get('PRICE_FILTER'),
+                'MIN_NOTIONAL': notional,
+                'quoteAsset': symbol_info.get('quoteAsset'),
+            }
+            # Escalas enteras calculadas una sola vez por símbolo
+            symbol_filters['scales'] = SymbolScales(symbol_filters)
+            filters[symbol_info['symbol']] = symbol_filters
+        with self.lock:
+            self.filters = filters
+            self.loaded_at = time.monotonic()
+
+    def refresh(self, client):
+        """Descarga de nuevo la información del exchange"""
+        self.update(client.get_exchange_info())
+
+    def invalidate(self):
+        """Fuerza una recarga en el próximo acceso"""
+        with self.lock:
+            self.loaded_at = None
+
+    def get(self, client, symbol):
+        """Devuelve los filtros de un símbolo, recargando si la cache venció"""
+        if self.is_expired():
+            # Un solo hilo descarga; el resto espera y reutiliza el resultado
+            with self.refresh_lock:
+                if self.is_expired():
+                    self.refresh(client)
+        symbol_filters = self.filters.get(symbol)
+        if not symbol_filters:
+            raise Exception(f"Información del mercado no encontrada para {symbol}")
+        return symbol_filters
+
+
+def is_filter_failure(error):
+    """Indica si una excepción de Binance se debe a un filtro del símbolo"""
+    return getattr(error, 'code', None) in FILTER_FAILURE_CODES or 'Filter failure' in str(error)
+
+
+# Cache única para todas las instancias de TradingBot del proceso
+filters_cache = ExchangeFiltersCache()
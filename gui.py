@@ -1,7 +1,12 @@
+import os
 import tkinter as tk
 from tkinter import messagebox
 from threading import Thread
 from bot_logic import TradingBot
+from log_channel import LogChannel
+
+LOG_POLL_MS = 100  # Cada cuánto la GUI vacía la cola de logs
+MAX_LOG_LINES = 1000  # Líneas que conserva el área de logs
 
 
 class TradingBotApp:
@@ -64,12 +69,28 @@ class TradingBotApp:
         self.logs_text = tk.Text(root, height=10, width=50, state=tk.DISABLED)
         self.logs_text.grid(row=13, columnspan=2)
 
+        # Canal de logs: el hilo del bot encola y solo el hilo de Tk toca el widget
+        self.log_channel = LogChannel(file_path=os.getenv("BOT_LOG_FILE"))
+        self.root.after(LOG_POLL_MS, self.drain_logs)
+
     def log_message(self, message):
-        """Muestra un mensaje en el área de logs."""
-        self.logs_text.config(state=tk.NORMAL)
-        self.logs_text.insert(tk.END, message + "\n")
-        self.logs_text.see(tk.END)
-        self.logs_text.config(state=tk.DISABLED)
+        """Encola un mensaje para el área de logs (se puede llamar desde cualquier hilo)."""
+        self.log_channel.put(message)
+
+    def drain_logs(self):
+        """Vuelca por lotes los mensajes pendientes en el área de logs."""
+        messages = self.log_channel.drain()
+        if messages:
+            self.logs_text.config(state=tk.NORMAL)
+            self.logs_text.insert(tk.END, "\n".join(messages) + "\n")
+            # Conservar solo las últimas MAX_LOG_LINES líneas
+            extra_lines = int(self.logs_text.index("end-1c").split(".")[0]) - 1 - MAX_LOG_LINES
+            if extra_lines > 0:
+                self.logs_text.delete("1.0", f"{extra_lines + 1}.0")
+            self.logs_text.see(tk.END)
+            self.logs_text.config(state=tk.DISABLED)
+            self.log_channel.flush()
+        self.root.after(LOG_POLL_MS, self.drain_logs)
 
     def start_bot(self):
         if self.bot_running:
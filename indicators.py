@@ -0,0 +1,239 @@
+import math
+from strategy import BUY
+
+# Indicadores incrementales: cada update es O(1) y el estado vive en __slots__,
+# así cientos de símbolos pueden actualizarlos en cada tick.
+
+
+class EMA:
+    """Media móvil exponencial"""
+
+    __slots__ = ('alpha', 'period', 'value', 'count')
+
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.value = None
+        self.count = 0
+
+    @property
+    def ready(self):
+        return self.count >= self.period
+
+    def update(self, price):
+        self.count += 1
+        self.value = price if self.value is None else self.value + self.alpha * (price - self.value)
+        return self.value
+
+
+class RollingVolatility:
+    """Desvío estándar de los retornos logarítmicos de las últimas window observaciones"""
+
+    __slots__ = ('window', 'returns', 'index', 'count', 'total', 'total_sq', 'last_price')
+
+    def __init__(self, window=60):
+        self.window = window
+        self.returns = [0.0] * window  # Buffer circular
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.last_price = None
+
+    @property
+    def ready(self):
+        return self.count >= self.window
+
+    @property
+    def value(self):
+        n = min(self.count, self.window)
+        if n < 2:
+            return None
+        mean = self.total / n
+        return math.sqrt(max(0.0, self.total_sq / n - mean * mean))
+
+    def update(self, price):
+        if self.last_price is not None and price > 0 and self.last_price > 0:
+            r = math.log(price / self.last_price)
+            old = self.returns[self.index]
+            self.returns[self.index] = r
+            self.index = (self.index + 1) % self.window
+            self.count += 1
+            if self.index == 0:
+                # Una vuelta completa: recalcular las sumas para que no acumulen error de redondeo
+                self.total = sum(self.returns)
+                self.total_sq = sum(x * x for x in self.returns)
+            else:
+                self.total += r - old
+                self.total_sq += r * r - old * old
+        self.last_price = price
+        return self.value
+
+
+class VWAP:
+    """Precio promedio ponderado por volumen de las últimas window observaciones (sin volumen, media simple)"""
+
+    __slots__ = ('window', 'notionals', 'volumes', 'index', 'count', 'notional', 'volume')
+
+    def __init__(self, window=60):
+        self.window = window
+        self.notionals = [0.0] * window
+        self.volumes = [0.0] * window
+        self.index = 0
+        self.count = 0
+        self.notional = 0.0
+        self.volume = 0.0
+
+    @property
+    def ready(self):
+        return self.count >= self.window
+
+    @property
+    def value(self):
+        return self.notional / self.volume if self.volume else None
+
+    def update(self, price, volume=1.0):
+        i = self.index
+        self.notional += price * volume - self.notionals[i]
+        self.volume += volume - self.volumes[i]
+        self.notionals[i] = price * volume
+        self.volumes[i] = volume
+        self.index = (i + 1) % self.window
+        self.count += 1
+        if self.index == 0:
+            self.notional = sum(self.notionals)
+            self.volume = sum(self.volumes)
+        return self.value
+
+
+class RSI:
+    """Índice de fuerza relativa con el suavizado de Wilder"""
+
+    __slots__ = ('period', 'avg_gain', 'avg_loss', 'count', 'last_price')
+
+    def __init__(self, period=14):
+        self.period = period
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0
+        self.last_price = None
+
+    @property
+    def ready(self):
+        return self.count >= self.period
+
+    @property
+    def value(self):
+        if not self.count:
+            return None
+        if not self.avg_loss:
+            return 100.0 if self.avg_gain else 50.0
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+    def update(self, price):
+        if self.last_price is not None:
+            change = price - self.last_price
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            self.count += 1
+            # Hasta completar el período se promedia; después, suavizado exponencial de Wilder
+            n = min(self.count, self.period)
+            self.avg_gain += (gain - self.avg_gain) / n
+            self.avg_loss += (loss - self.avg_loss) / n
+        self.last_price = price
+        return self.value
+
+
+# --- Filtros para MartingaleStrategy: bloquean decisiones mientras el indicador no las confirme ---
+
+
+class TrendGate:
+    """Compras por tendencia alcista solo si la EMA rápida está por encima de la lenta"""
+
+    __slots__ = ('fast', 'slow')
+
+    def __init__(self, fast=12, slow=26):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+
+    def update(self, price):
+        self.fast.update(price)
+        self.slow.update(price)
+
+    def allows(self, decision):
+        if decision.action != BUY or decision.reason != 'alcista':
+            return True
+        return self.slow.ready and self.fast.value > self.slow.value
+
+
+class VolatilityGate:
+    """No promedia a la baja mientras la volatilidad supere max_volatility (cuchillo que cae)"""
+
+    __slots__ = ('volatility', 'max_volatility')
+
+    def __init__(self, window=60, max_volatility=0.01):
+        self.volatility = RollingVolatility(window)
+        self.max_volatility = max_volatility
+
+    def update(self, price):
+        self.volatility.update(price)
+
+    def allows(self, decision):
+        if decision.action != BUY or decision.reason != 'caida':
+            return True
+        return self.volatility.ready and self.volatility.value <= self.max_volatility
+
+
+class RSIGate:
+    """No compra con el mercado sobrecomprado"""
+
+    __slots__ = ('rsi', 'overbought')
+
+    def __init__(self, period=14, overbought=70):
+        self.rsi = RSI(period)
+        self.overbought = overbought
+
+    def update(self, price):
+        self.rsi.update(price)
+
+    def allows(self, decision):
+        if decision.action != BUY:
+            return True
+        return self.rsi.ready and self.rsi.value < self.overbought
+
+
+class VWAPGate:
+    """La primera compra solo por debajo del VWAP (más max_premium)"""
+
+    __slots__ = ('vwap', 'max_premium')
+
+    def __init__(self, window=60, max_premium=0.0):
+        self.vwap = VWAP(window)
+        self.max_premium = max_premium
+
+    def update(self, price):
+        self.vwap.update(price)
+
+    def allows(self, decision):
+        if decision.action != BUY or decision.reason != 'primera':
+            return True
+        return self.vwap.ready and decision.price <= self.vwap.value * (1 + self.max_premium)
+
+
+GATES = {
+    'trend': TrendGate,
+    'volatility': VolatilityGate,
+    'rsi': RSIGate,
+    'vwap': VWAPGate,
+}
+
+
+def build_gates(specs):
+    """Crea los filtros a partir de la configuración: [{"type": "trend", "fast": 12, "slow": 26}, ...]"""
+    gates = []
+    for spec in specs or []:
+        spec = dict(spec)
+        kind = spec.pop('type')
+        if kind not in GATES:
+            raise ValueError(f"Filtro desconocido: {kind}")
+        gates.append(GATES[kind](**spec))
+    return gates
@@ -0,0 +1,110 @@
+import bisect
+from datetime import date, datetime
+import numpy as np
+from catalogo import SIN_PRECIO
+
+_DESPLAZAMIENTO = 1 << 31  # Los días pueden ser negativos: se corren para que la clave sea positiva
+_SIN_FECHA = (1 << 32) - 1  # Inicio de las filas sin fecha: nunca queda antes de una consulta
+
+
+def fecha_dias(fecha):
+    """Días desde 1970-01-01 de un "1/4/2025", date, datetime, Timestamp o datetime64"""
+    if isinstance(fecha, str):
+        fecha = datetime.strptime(fecha.strip(), "%d/%m/%Y").date()
+    elif isinstance(fecha, datetime):
+        fecha = fecha.date()
+    if isinstance(fecha, date):
+        return (fecha - date(1970, 1, 1)).days
+    return int(np.datetime64(fecha, "D").astype("i8"))
+
+
+class IndicePrecios:
+    """Actividad -> categoría -> períodos ordenados por inicio; el precio de una fecha sale por bisect"""
+
+    def __init__(self, filas):
+        filas = np.sort(np.asarray(filas), order=["actividad", "categoria", "inicio"], kind="stable")
+        if len(filas):
+            # Las filas repetidas (mismo período y precio) cuentan una sola vez
+            repetida = np.zeros(len(filas), dtype=bool)
+            repetida[1:] = filas[1:] == filas[:-1]
+            filas = filas[~repetida]
+        self.filas = filas
+        self.grupos = {}  # (actividad, categoria) -> (número de grupo, desde, hasta)
+        nuevo = np.ones(len(filas), dtype=bool)
+        nuevo[1:] = (filas["actividad"][1:] != filas["actividad"][:-1]) | (filas["categoria"][1:] != filas["categoria"][:-1])
+        desde = np.flatnonzero(nuevo)
+        hasta = np.append(desde[1:], len(filas))
+        for grupo, (lo, hi) in enumerate(zip(desde, hasta)):
+            self.grupos[(str(filas["actividad"][lo]), str(filas["categoria"][lo]))] = (grupo, int(lo), int(hi))
+        numero = np.cumsum(nuevo) - 1
+        inicio = filas["inicio"].astype("i8")
+        inicio = np.where(np.isnat(filas["inicio"]), _SIN_FECHA, inicio + _DESPLAZAMIENTO)
+        # Clave (grupo, inicio) en un entero: un solo arreglo ordenado para todas las búsquedas
+        self.claves = (numero.astype("i8") << 32) | inicio
+        self.lista_claves = self.claves.tolist()  # bisect sobre una lista es más rápido que numpy para una consulta
+        self.fines = np.where(np.isnat(filas["fin"]), np.iinfo("i8").min, filas["fin"].astype("i8"))
+        self.centavos = filas["centavos"].astype("i8")
+
+    def __len__(self):
+        return len(self.filas)
+
+    def periodos(self, actividad, categoria):
+        """(inicio, fin, centavos) de la categoría ordenados por fecha de inicio"""
+        grupo = self.grupos.get((actividad, categoria))
+        if grupo is None:
+            return []
+        _, lo, hi = grupo
+        filas = self.filas[lo:hi]
+        return list(zip(filas["inicio"], filas["fin"], filas["centavos"].tolist()))
+
+    def posicion(self, grupo, dias):
+        """Fila vigente en la fecha; con períodos solapados gana el que empezó más tarde"""
+        numero, lo, _ = grupo
+        i = bisect.bisect_right(self.lista_claves, (numero << 32) | (dias + _DESPLAZAMIENTO)) - 1
+        while i >= lo:
+            if self.fines[i] >= dias:
+                return i
+            i -= 1
+        return None
+
+    def tarifa(self, actividad, categoria, fecha):
+        """(centavos, inicio, fin) del período que incluye la fecha, o None"""
+        grupo = self.grupos.get((actividad, categoria))
+        if grupo is None:
+            return None
+        i = self.posicion(grupo, fecha_dias(fecha))
+        if i is None:
+            return None
+        return int(self.centavos[i]), self.filas["inicio"][i], self.filas["fin"][i]
+
+    def precio(self, actividad, categoria, fecha):
+        """Centavos vigentes en la fecha, o None"""
+        encontrada = self.tarifa(actividad, categoria, fecha)
+        return encontrada[0] if encontrada else None
+
+    def precios(self, consultas):
+        """Centavos para muchas (actividad, categoria, fecha) a la vez; SIN_PRECIO donde no hay tarifa"""
+        consultas = list(consultas)
+        resultado = np.full(len(consultas), SIN_PRECIO, dtype="i8")
+        if not consultas or not len(self.filas):
+            return resultado
+        numeros = np.full(len(consultas), -1, dtype="i8")
+        dias = np.zeros(len(consultas), dtype="i8")
+        for k, (actividad, categoria, fecha) in enumerate(consultas):
+            grupo = self.grupos.get((actividad, categoria))
+            if grupo is not None:
+                numeros[k] = grupo[0]
+                dias[k] = fecha_dias(fecha)
+        i = np.searchsorted(self.claves, (numeros << 32) | (dias + _DESPLAZAMIENTO), side="right") - 1
+        validas = (numeros >= 0) & (i >= 0)  # i == -1: fecha anterior al primer período del primer grupo
+        i = np.maximum(i, 0)
+        mismo_grupo = validas & ((self.claves[i] >> 32) == numeros)
+        vigente = mismo_grupo & (self.fines[i] >= dias)
+        resultado[vigente] = self.centavos[i[vigente]]
+        # Las pocas que caen fuera del último período pueden estar cubiertas por uno solapado más largo
+        for k in np.flatnonzero(mismo_grupo & ~vigente):
+            actividad, categoria, _ = consultas[k]
+            j = self.posicion(self.grupos[(actividad, categoria)], int(dias[k]))
+            if j is not None:
+                resultado[k] = self.centavos[j]
+        return resultado
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from langchain.schema import Document
+from langchain.text_splitter import CharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+from catalogo import firma
+from embeddings import modelo_de
+
+RUTA = "indice_faiss"  # Carpeta con index.faiss, index.pkl y manifiesto.json
+MANIFIESTO = "manifiesto.json"
+
+_cache = {}  # ruta -> (Catalogo, modelo, FAISS)
+_lock = threading.Lock()
+
+
+def fragmentos(catalogo, chunk_size=1000, chunk_overlap=100):
+    """Fragmentos por actividad, identificados por el hash de su contenido"""
+    splitter = CharacterTextSplitter(separator="\n", chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    documentos = {}
+    # Cada CSV se parte por separado: un cambio en uno no corre los cortes de los demás
+    for actividad, df in catalogo.originales.items():
+        texto = f"\n--- {actividad} ---\n" + df.fillna("").to_string(index=False)
+        for fragmento in splitter.split_text(texto):
+            clave = hashlib.sha256(f"{actividad}\n{fragmento}".encode("utf-8")).hexdigest()
+            documentos[clave] = Document(page_content=fragmento, metadata={"actividad": actividad})
+    return documentos
+
+
+def leer_manifiesto(ruta):
+    try:
+        with open(os.path.join(ruta, MANIFIESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def guardar(vectorstore, ruta, modelo, claves, actual):
+    """Guarda el índice y después el manifiesto; sin manifiesto nuevo se vuelve a verificar todo"""
+    vectorstore.save_local(ruta)
+    temporal = os.path.join(ruta, f"{MANIFIESTO}.{os.getpid()}.tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"modelo": modelo, "firma": actual, "fragmentos": sorted(claves)}, f)
+    os.replace(temporal, os.path.join(ruta, MANIFIESTO))
+
+
+def actualizar(catalogo, embedding, ruta=RUTA, log=print):
+    """Carga el índice del disco y calcula embeddings solo de los fragmentos nuevos o modificados"""
+    modelo = modelo_de(embedding)
+    actual = firma(catalogo.base_path)
+    manifiesto = leer_manifiesto(ruta)
+    vectorstore = None
+    if manifiesto and manifiesto.get("modelo") == modelo:
+        try:
+            # El pickle del docstore lo escribe este mismo módulo
+            vectorstore = FAISS.load_local(ruta, embedding, allow_dangerous_deserialization=True)
+        except Exception as e:
+            log(f"No se pudo leer el índice en {ruta}, se reconstruye: {e}")
+    if vectorstore is not None and tuple(map(tuple, manifiesto.get("firma", []))) == actual:
+        return vectorstore  # Mismos CSV que la última vez: ni siquiera hace falta partirlos
+    deseados = fragmentos(catalogo)
+    if vectorstore is None:
+        if os.path.isdir(ruta):
+            shutil.rmtree(ruta)
+        log(f"Calculando embeddings de {len(deseados)} fragmentos...")
+        vectorstore = FAISS.from_documents(list(deseados.values()), embedding, ids=list(deseados))
+        guardar(vectorstore, ruta, modelo, deseados, actual)
+        return vectorstore
+
+    guardados = set(vectorstore.index_to_docstore_id.values())
+    viejos = [clave for clave in guardados if clave not in deseados]
+    nuevos = [clave for clave in deseados if clave not in guardados]
+    if viejos:
+        vectorstore.delete(viejos)
+    if nuevos:
+        log(f"Calculando embeddings de {len(nuevos)} fragmentos nuevos ({len(viejos)} descartados)...")
+        vectorstore.add_documents([deseados[clave] for clave in nuevos], ids=nuevos)
+    guardar(vectorstore, ruta, modelo, deseados, actual)
+    return vectorstore
+
+
+def obtener_indice(catalogo, embedding, ruta=RUTA, log=print):
+    """Índice FAISS compartido por el proceso; se revisa contra el disco solo si cambió el catálogo"""
+    modelo = modelo_de(embedding)
+    with _lock:
+        guardado = _cache.get(ruta)
+        # obtener_catalogo devuelve el mismo objeto mientras los CSV no cambien
+        if guardado is None or guardado[0] is not catalogo or guardado[1] != modelo:
+            _cache[ruta] = (catalogo, modelo, actualizar(catalogo, embedding, ruta, log))
+        return _cache[ruta][2]
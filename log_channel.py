@@ -0,0 +1,55 @@
+import json
+import queue
+import threading
+import time
+
+
+class LogChannel:
+    """Cola acotada de mensajes: el bot escribe sin bloquearse y la GUI vacía por lotes"""
+
+    def __init__(self, maxsize=10000, file_path=None):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0  # Mensajes descartados por cola llena
+        self.file_path = file_path  # Opcional: copia de cada mensaje en JSON lines
+        self.file = open(file_path, "a", encoding="utf-8") if file_path else None
+        self.file_lock = threading.Lock()
+
+    def put(self, message, source=None):
+        """Nunca bloquea: si la cola está llena descarta el mensaje más viejo"""
+        if self.file:
+            with self.file_lock:
+                self.file.write(json.dumps({'ts': time.time(), 'source': source, 'message': message}, ensure_ascii=False) + "\n")
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def drain(self, max_items=500):
+        """Devuelve hasta max_items mensajes pendientes"""
+        messages = []
+        while len(messages) < max_items:
+            try:
+                messages.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if self.dropped:
+            messages.append(f"... {self.dropped} mensajes descartados por saturación del log")
+            self.dropped = 0
+        return messages
+
+    def flush(self):
+        if self.file:
+            with self.file_lock:
+                self.file.flush()
+
+    def close(self):
+        if self.file:
+            with self.file_lock:
+                self.file.close()
+            self.file = None
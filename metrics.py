@@ -0,0 +1,206 @@
+import bisect
+import json
+import os
+import threading
+import time
+
+# Límites de los buckets en segundos: escala logarítmica de 1 µs a ~100 s
+DEFAULT_BUCKETS = tuple(1e-6 * 1.2 ** i for i in range(102))
+
+
+class LatencyHistogram:
+    """Histograma de buckets fijos: observe es O(log buckets) y no guarda muestras"""
+
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """Suma otro histograma con los mismos buckets (p. ej. el mismo stage de varios mercados)"""
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """Límite superior del bucket que contiene el percentil q (0-1)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': self.max,
+        }
+
+
+class Timer:
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class Metrics:
+    """Histogramas de latencia por etapa y mercado, exportados a uno o más sinks"""
+
+    def __init__(self, sinks=None, enabled=True):
+        self.sinks = list(sinks or [])
+        self.enabled = enabled
+        self.histograms = {}  # (stage, market) -> LatencyHistogram
+        self.gauges = {}  # (name, market) -> valor
+        self.lock = threading.Lock()
+        self.export_thread = None
+        self.exporting = False
+
+    def histogram(self, stage, market=None):
+        key = (stage, market)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram())
+        return histogram
+
+    def timer(self, stage, market=None):
+        """Context manager que mide la duración de una etapa"""
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self.histogram(stage, market))
+
+    def observe(self, stage, seconds, market=None):
+        if self.enabled:
+            self.histogram(stage, market).observe(seconds)
+
+    def set_gauge(self, name, value, market=None):
+        if self.enabled:
+            self.gauges[(name, market)] = value
+
+    def snapshot(self):
+        with self.lock:
+            histograms = list(self.histograms.items())
+        return {
+            'timestamp': time.time(),
+            'stages': [dict(stage=stage, market=market, **h.summary()) for (stage, market), h in histograms],
+            'gauges': [{'name': name, 'market': market, 'value': value} for (name, market), value in list(self.gauges.items())],
+        }
+
+    def export(self):
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.write(snapshot)
+
+    def start_export(self, interval=10):
+        """Exporta periódicamente en un hilo aparte"""
+        self.exporting = True
+
+        def run():
+            while self.exporting:
+                time.sleep(interval)
+                self.export()
+        self.export_thread = threading.Thread(target=run, daemon=True)
+        self.export_thread.start()
+
+    def stop_export(self):
+        self.exporting = False
+        self.export()
+
+
+class NullMetrics(Metrics):
+    """Métricas desactivadas: timer devuelve siempre el mismo objeto vacío"""
+
+    def __init__(self):
+        super().__init__(enabled=False)
+
+    def timer(self, stage, market=None):
+        return NULL_TIMER
+
+
+NULL_METRICS = NullMetrics()
+
+
+def labels(entry, **extra):
+    pairs = [('stage', entry.get('stage')), ('name', entry.get('name')), ('market', entry.get('market'))]
+    pairs += list(extra.items())
+    return ",".join(f'{k}="{v}"' for k, v in pairs if v is not None)
+
+
+class PrometheusFileSink:
+    """Archivo en formato de texto de Prometheus (para el textfile collector de node_exporter)"""
+
+    def __init__(self, path, prefix='tdfbot'):
+        self.path = path
+        self.prefix = prefix
+
+    def write(self, snapshot):
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# TYPE {name} summary"]
+        for entry in snapshot['stages']:
+            for q in ('p50', 'p95', 'p99'):
+                lines.append(f"{name}{{{labels(entry, quantile='0.' + q[1:])}}} {entry[q]:.9f}")
+            lines.append(f"{name}_sum{{{labels(entry)}}} {entry['mean'] * entry['count']:.9f}")
+            lines.append(f"{name}_count{{{labels(entry)}}} {entry['count']}")
+        gauge = f"{self.prefix}_gauge"
+        lines.append(f"# TYPE {gauge} gauge")
+        for entry in snapshot['gauges']:
+            lines.append(f"{gauge}{{{labels(entry)}}} {entry['value']}")
+        # Escritura atómica para que el collector nunca lea un archivo a medias
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+class JsonLinesSink:
+    """Agrega una línea JSON por exportación"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, snapshot):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot) + "\n")
@@ -0,0 +1,209 @@
+import bisect
+import math
+import threading
+import time
+
+
+class LocalOrderBook:
+    """Libro de órdenes de un símbolo en listas ordenadas, actualizado con los diffs de Binance"""
+
+    def __init__(self, symbol, max_levels=5000):
+        self.symbol = symbol.upper()
+        self.max_levels = max_levels  # Niveles por lado; los más lejanos se descartan
+        # Ambos lados en orden ascendente de precio: el mejor bid es el último, el mejor ask el primero
+        self.bid_prices, self.bid_qtys = [], []
+        self.ask_prices, self.ask_qtys = [], []
+        self.last_update_id = None  # None = sin sincronizar
+        self.updated = None
+        self.lock = threading.Lock()
+
+    @property
+    def synced(self):
+        return self.last_update_id is not None
+
+    def load_snapshot(self, snapshot):
+        """Reemplaza el libro con la respuesta de get_order_book"""
+        with self.lock:
+            bids = sorted((float(p), float(q)) for p, q in snapshot['bids'] if float(q))
+            asks = sorted((float(p), float(q)) for p, q in snapshot['asks'] if float(q))
+            self.bid_prices, self.bid_qtys = [p for p, _ in bids], [q for _, q in bids]
+            self.ask_prices, self.ask_qtys = [p for p, _ in asks], [q for _, q in asks]
+            self.last_update_id = snapshot['lastUpdateId']
+            self.updated = time.monotonic()
+
+    def update_level(self, prices, qtys, price, qty, is_bid):
+        i = bisect.bisect_left(prices, price)
+        if i < len(prices) and prices[i] == price:
+            if qty:
+                qtys[i] = qty
+            else:
+                del prices[i]
+                del qtys[i]
+        elif qty:
+            prices.insert(i, price)
+            qtys.insert(i, qty)
+            if len(prices) > self.max_levels:
+                # Se descarta el nivel más alejado del precio
+                if is_bid:
+                    del prices[0]
+                    del qtys[0]
+                else:
+                    prices.pop()
+                    qtys.pop()
+
+    def apply_diff(self, event):
+        """Aplica un evento depthUpdate (U, u, b, a); devuelve False si hay un hueco y hay que resincronizar"""
+        with self.lock:
+            if self.last_update_id is None:
+                return False
+            if event['u'] <= self.last_update_id:
+                return True  # Ya incluido en el snapshot
+            if event['U'] > self.last_update_id + 1:
+                self.last_update_id = None
+                return False
+            for price, qty in event['b']:
+                self.update_level(self.bid_prices, self.bid_qtys, float(price), float(qty), True)
+            for price, qty in event['a']:
+                self.update_level(self.ask_prices, self.ask_qtys, float(price), float(qty), False)
+            self.last_update_id = event['u']
+            self.updated = time.monotonic()
+            return True
+
+    def best_bid(self):
+        return self.bid_prices[-1] if self.bid_prices else None
+
+    def best_ask(self):
+        return self.ask_prices[0] if self.ask_prices else None
+
+    def mid(self):
+        bid, ask = self.best_bid(), self.best_ask()
+        return (bid + ask) / 2 if bid and ask else None
+
+    def levels(self, side):
+        """Niveles que consume una orden de mercado, del mejor al peor"""
+        if side == 'BUY':
+            return zip(self.ask_prices, self.ask_qtys)
+        return zip(reversed(self.bid_prices), reversed(self.bid_qtys))
+
+    def estimate(self, side, quantity):
+        """(precio promedio, deslizamiento relativo al mejor precio, cantidad cubierta) de una orden de mercado"""
+        with self.lock:
+            best = self.best_ask() if side == 'BUY' else self.best_bid()
+            if not best or quantity <= 0:
+                return None, None, 0.0
+            remaining, cost = quantity, 0.0
+            for price, qty in self.levels(side):
+                take = min(qty, remaining)
+                cost += take * price
+                remaining -= take
+                if remaining <= 0:
+                    break
+            filled = quantity - max(remaining, 0.0)
+            average = cost / filled
+            return average, abs(average - best) / best, filled
+
+    def max_quantity(self, side, max_slippage):
+        """Mayor cantidad cuyo precio promedio no se aleja más de max_slippage del mejor precio"""
+        with self.lock:
+            best = self.best_ask() if side == 'BUY' else self.best_bid()
+            if not best:
+                return 0.0
+            limit = best * (1 + max_slippage) if side == 'BUY' else best * (1 - max_slippage)
+            quantity, cost = 0.0, 0.0
+            for price, qty in self.levels(side):
+                # Si el nivel entero pasa el límite, se toma solo la parte que deja el promedio justo en él
+                if (cost + qty * price - limit * (quantity + qty)) * (1 if side == 'BUY' else -1) > 0:
+                    if price != limit:
+                        quantity += (limit * quantity - cost) / (price - limit)
+                    break
+                quantity += qty
+                cost += qty * price
+            return quantity
+
+    def split(self, side, quantity, max_slippage, max_chunks=10):
+        """Divide la orden en partes iguales que el libro actual absorbe dentro de max_slippage"""
+        capacity = self.max_quantity(side, max_slippage)
+        if capacity <= 0:
+            return [quantity]
+        chunks = min(max_chunks, max(1, math.ceil(quantity / capacity)))
+        return [quantity / chunks] * chunks
+
+
+class DepthCache:
+    """Libros locales por símbolo: snapshot por REST y, si se inicia el stream, diffs por websocket"""
+
+    def __init__(self, client, max_age=5.0, limit=100, api_key=None, api_secret=None, log_callback=None):
+        self.client = client
+        self.max_age = max_age  # Sin stream, segundos antes de pedir otro snapshot
+        self.limit = limit  # Niveles del snapshot (peso 5 hasta 100 niveles)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.log_callback = log_callback
+        self.books = {}
+        self.buffers = {}  # Diffs recibidos mientras el libro no está sincronizado
+        self.manager = None
+        self.lock = threading.Lock()
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+        else:
+            print(message)
+
+    def book(self, symbol):
+        """Libro del símbolo, sincronizándolo si hace falta"""
+        symbol = symbol.upper()
+        with self.lock:
+            book = self.books.setdefault(symbol, LocalOrderBook(symbol))
+        streaming = self.manager is not None
+        if not book.synced or (not streaming and time.monotonic() - book.updated > self.max_age):
+            self.sync(book)
+        return book
+
+    def sync(self, book):
+        """Snapshot por REST y aplicación de los diffs que llegaron mientras tanto"""
+        snapshot = self.client.get_order_book(symbol=book.symbol, limit=self.limit)
+        # Con el lock tomado ningún diff nuevo se cuela entre el snapshot y los pendientes
+        with self.lock:
+            book.load_snapshot(snapshot)
+            pending, self.buffers[book.symbol] = self.buffers.get(book.symbol, []), []
+            for event in pending:
+                if not book.apply_diff(event):
+                    self.log(f"Hueco en los diffs de {book.symbol}: se vuelve a pedir el snapshot")
+                    return
+
+    def start_stream(self, symbols):
+        """Mantiene los libros con el stream de diffs (@depth@100ms)"""
+        from binance import ThreadedWebsocketManager
+
+        self.manager = ThreadedWebsocketManager(api_key=self.api_key, api_secret=self.api_secret)
+        self.manager.start()
+        for symbol in symbols:
+            symbol = symbol.upper()
+            with self.lock:
+                self.books.setdefault(symbol, LocalOrderBook(symbol))
+            self.manager.start_depth_socket(callback=self.on_message, symbol=symbol, interval=100)
+
+    def stop_stream(self):
+        if self.manager:
+            self.manager.stop()
+            self.manager = None
+        # Sin stream, los libros vuelven a refrescarse por snapshot
+        for book in list(self.books.values()):
+            book.last_update_id = None
+
+    def on_message(self, msg):
+        if msg.get('e') != 'depthUpdate':
+            if msg.get('e') == 'error':
+                self.log(f"Error en el stream de profundidad: {msg.get('m')}")
+            return
+        book = self.books.get(msg['s'])
+        if book is None:
+            return
+        with self.lock:
+            if not book.synced:
+                self.buffers.setdefault(book.symbol, []).append(msg)
+            elif not book.apply_diff(msg):
+                # Se perdió un evento: se guarda este y book() pedirá un snapshot nuevo
+                self.log(f"Hueco en los diffs de {book.symbol}: se vuelve a pedir el snapshot")
+                self.buffers[book.symbol] = [msg]
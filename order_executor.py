@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import time
+import uuid
+
+# Errores que Binance devuelve antes de procesar la orden: se puede reintentar sin riesgo
+RETRY_CODES = (-1003, -1015)
+# Binance no sabe si la orden se ejecutó
+UNKNOWN_CODES = (-1006, -1007)
+ORDER_NOT_FOUND = -2013
+
+
+class OrderStatusUnknown(Exception):
+    """No se pudo confirmar si la orden llegó al exchange"""
+
+    def __init__(self, client_order_id):
+        super().__init__(f"No se pudo confirmar la orden {client_order_id}")
+        self.client_order_id = client_order_id
+
+
+def new_client_order_id(market):
+    # Binance acepta hasta 36 caracteres [.A-Za-z0-9:/_-]
+    return f"tdf-{market[:10]}-{uuid.uuid4().hex[:20]}"
+
+
+def classify(error):
+    """'retry', 'unknown' o 'rejected' según el error de la orden"""
+    code = getattr(error, 'code', None)
+    status_code = getattr(error, 'status_code', None)
+    if code in RETRY_CODES:
+        return 'retry'
+    if code in UNKNOWN_CODES or (status_code is not None and status_code >= 500):
+        return 'unknown'
+    if code is None:
+        # Timeout o error de red: la orden pudo haber llegado
+        return 'unknown'
+    return 'rejected'
+
+
+def backoff(attempt, base=0.2, cap=5.0):
+    return min(cap, base * 2 ** attempt)
+
+
+class OrderExecutor:
+    """Órdenes de mercado idempotentes: client order id, reintentos y reconciliación"""
+
+    def __init__(self, client, max_attempts=4, max_in_flight=1, log_callback=None):
+        self.client = client
+        self.max_attempts = max_attempts
+        self.max_in_flight = max_in_flight  # Órdenes simultáneas por símbolo
+        self.log_callback = log_callback
+        self.limits = {}
+        self.lock = threading.Lock()
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+        else:
+            print(message)
+
+    def slot(self, market):
+        with self.lock:
+            if market not in self.limits:
+                self.limits[market] = threading.BoundedSemaphore(self.max_in_flight)
+            return self.limits[market]
+
+    def find_order(self, market, client_order_id):
+        """Consulta la orden por su client id; None si el exchange no la tiene"""
+        for attempt in range(self.max_attempts):
+            try:
+                return self.client.get_order(symbol=market, origClientOrderId=client_order_id)
+            except Exception as e:
+                if getattr(e, 'code', None) == ORDER_NOT_FOUND:
+                    return None
+                self.log(f"Error consultando la orden {client_order_id}: {e}")
+                time.sleep(backoff(attempt))
+        raise OrderStatusUnknown(client_order_id)
+
+    def reconcile(self, market, client_order_id):
+        """Busca una orden que pudo haber llegado; si no aparece, su estado queda desconocido"""
+        for attempt in range(self.max_attempts):
+            order = self.find_order(market, client_order_id)
+            if order:
+                return order
+            time.sleep(backoff(attempt))
+        raise OrderStatusUnknown(client_order_id)
+
+    def place(self, market, side, quantity):
+        """Envía la orden; devuelve la respuesta del exchange o lanza la excepción del rechazo"""
+        client_order_id = new_client_order_id(market)
+        with self.slot(market):
+            for attempt in range(self.max_attempts):
+                try:
+                    return self.client.create_order(symbol=market, side=side, type='MARKET', quantity=quantity,
+                                                    newClientOrderId=client_order_id)
+                except Exception as e:
+                    kind = classify(e)
+                    if kind == 'unknown':
+                        # Nunca se reenvía: Binance acepta el mismo client id otra vez una vez ejecutada la
+                        # primera orden, y una que aparece tarde más el reenvío sería una compra doble
+                        self.log(f"Orden {client_order_id} sin confirmar ({e}), se verifica en el exchange")
+                        return self.reconcile(market, client_order_id)
+                    if kind == 'rejected' or attempt == self.max_attempts - 1:
+                        raise
+                    # Rechazada por límite de peso antes de procesarse: reenviar es seguro
+                    self.log(f"Orden {client_order_id} no procesada ({e}), reintento {attempt + 1}")
+                time.sleep(backoff(attempt))
+            raise Exception(f"La orden {client_order_id} no se pudo enviar tras {self.max_attempts} intentos")
+
+
+class AsyncOrderExecutor(OrderExecutor):
+    """Versión asíncrona para AsyncBotEngine"""
+
+    def slot(self, market):
+        if market not in self.limits:
+            self.limits[market] = asyncio.Semaphore(self.max_in_flight)
+        return self.limits[market]
+
+    async def find_order(self, market, client_order_id):
+        for attempt in range(self.max_attempts):
+            try:
+                return await self.client.get_order(symbol=market, origClientOrderId=client_order_id)
+            except Exception as e:
+                if getattr(e, 'code', None) == ORDER_NOT_FOUND:
+                    return None
+                self.log(f"Error consultando la orden {client_order_id}: {e}")
+                await asyncio.sleep(backoff(attempt))
+        raise OrderStatusUnknown(client_order_id)
+
+    async def reconcile(self, market, client_order_id):
+        for attempt in range(self.max_attempts):
+            order = await self.find_order(market, client_order_id)
+            if order:
+                return order
+            await asyncio.sleep(backoff(attempt))
+        raise OrderStatusUnknown(client_order_id)
+
+    async def place(self, market, side, quantity):
+        client_order_id = new_client_order_id(market)
+        async with self.slot(market):
+            for attempt in range(self.max_attempts):
+                try:
+                    return await self.client.create_order(symbol=market, side=side, type='MARKET', quantity=quantity,
+                                                          newClientOrderId=client_order_id)
+                except Exception as e:
+                    kind = classify(e)
+                    if kind == 'unknown':
+                        self.log(f"Orden {client_order_id} sin confirmar ({e}), se verifica en el exchange")
+                        return await self.reconcile(market, client_order_id)
+                    if kind == 'rejected' or attempt == self.max_attempts - 1:
+                        raise
+                    self.log(f"Orden {client_order_id} no procesada ({e}), reintento {attempt + 1}")
+                await asyncio.sleep(backoff(attempt))
+            raise Exception(f"La orden {client_order_id} no se pudo enviar tras {self.max_attempts} intentos")
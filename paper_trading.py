@@ -0,0 +1,158 @@
+import csv
+import itertools
+import os
+import threading
+from exchange import create_client
+from exchange_filters import filters_cache
+from price_service import PriceService
+from rate_limiter import RateLimitedClient, limiter
+from simulated_exchange import SimulatedExchange, SimulatedAPIException
+
+LEDGER_FIELDS = ['ts', 'symbol', 'side', 'quantity', 'price', 'quote_quantity', 'commission', 'quote_asset',
+                 'order_id', 'client_order_id']
+
+# Un solo cliente público y un solo ticker masivo para todos los bots en papel del proceso
+shared_client = None
+shared_service = None
+shared_exchanges = {}  # ledger_path -> PaperExchange: los bots comparten la cuenta simulada
+shared_lock = threading.Lock()
+
+
+def market_data():
+    """(cliente público, PriceService) compartidos; el servicio se inicia en el primer uso"""
+    global shared_client, shared_service
+    with shared_lock:
+        if shared_service is None:
+            shared_client = RateLimitedClient(create_client(backend='binance'), limiter)
+            shared_service = PriceService(shared_client)
+            shared_service.start()
+        return shared_client, shared_service
+
+
+class PaperExchange(SimulatedExchange):
+    """Órdenes simuladas sobre precios reales: mismo feed que los bots reales, sin tocar fondos"""
+
+    def __init__(self, price_service, market_client=None, balances=None, slippage=0.0005, fee=0.001,
+                 depth_cache=None, ledger_path="paper_ledger.csv", **options):
+        super().__init__(balances=balances, slippage=slippage, fee=fee, advance_on_read=False, **options)
+        self.price_service = price_service
+        # Cliente real solo para datos públicos (filtros y libro); None usa los filtros por defecto
+        self.market_client = market_client
+        self.depth_cache = depth_cache  # Si se indica, el precio de ejecución recorre el libro real
+        self.ledger_path = ledger_path
+        self.ledger_lock = threading.Lock()
+        if ledger_path and os.path.exists(ledger_path):
+            self.replay_ledger()
+
+    def replay_ledger(self):
+        """Reconstruye los saldos aplicando las operaciones ya registradas"""
+        rows = 0
+        with open(self.ledger_path, newline='') as f:
+            for rows, row in enumerate(csv.DictReader(f), 1):
+                base = row['symbol'][:-len(row['quote_asset'])]
+                quantity, quote_quantity, commission = float(row['quantity']), float(row['quote_quantity']), float(row['commission'])
+                sign = 1 if row['side'] == 'BUY' else -1
+                self.balances[base] = self.balances.get(base, 0.0) + sign * quantity
+                self.balances[row['quote_asset']] = self.balances.get(row['quote_asset'], 0.0) - sign * quote_quantity - commission
+        self.order_ids = itertools.count(rows + 1)
+
+    def add_symbol(self, symbol):
+        """Registra el símbolo en el simulador con sus filtros reales"""
+        if symbol in self.symbols:
+            return
+        filters = {}
+        if self.market_client is not None:
+            real = filters_cache.get(self.market_client, symbol)
+            lot_size, price_filter, notional = real['LOT_SIZE'] or {}, real['PRICE_FILTER'] or {}, real['MIN_NOTIONAL'] or {}
+            filters = {k: v for k, v in {
+                'stepSize': lot_size.get('stepSize'), 'minQty': lot_size.get('minQty'), 'maxQty': lot_size.get('maxQty'),
+                'tickSize': price_filter.get('tickSize'), 'minNotional': notional.get('minNotional'),
+                'quoteAsset': real.get('quoteAsset'),
+            }.items() if v is not None}
+        self.set_price(symbol, 0.0)  # Crea el símbolo con los filtros por defecto
+        self.symbols[symbol].update(filters)
+        self.price_service.track(symbol)
+
+    def current_price(self, symbol):
+        symbol = symbol.upper()
+        self.add_symbol(symbol)
+        price = self.price_service.get(symbol)
+        if price is None:
+            raise SimulatedAPIException(-1003, f"Sin precio reciente para {symbol} en el feed compartido")
+        return price
+
+    def read_price(self, symbol):
+        return self.current_price(symbol)
+
+    def get_symbol_ticker(self, symbol=None, **params):
+        if symbol is None:
+            return [{'symbol': s, 'price': str(p)} for s, (p, _) in list(self.price_service.prices.items())]
+        return {'symbol': symbol.upper(), 'price': str(self.read_price(symbol))}
+
+    def get_exchange_info(self):
+        if self.market_client is not None:
+            return self.market_client.get_exchange_info()
+        return super().get_exchange_info()
+
+    def get_order_book(self, symbol, limit=100, **params):
+        if self.market_client is not None:
+            return self.market_client.get_order_book(symbol=symbol, limit=limit)
+        return super().get_order_book(symbol, limit)
+
+    def fill_price(self, symbol, side, quantity):
+        """Precio observado más el slippage fijo; con depth_cache, el promedio de recorrer el libro"""
+        price = super().fill_price(symbol, side, quantity)
+        if self.depth_cache is not None:
+            try:
+                average, _, filled = self.depth_cache.book(symbol).estimate(side, quantity)
+                if average and filled >= quantity:
+                    direction = 1 if side == 'BUY' else -1
+                    price = average * (1 + direction * self.slippage)
+            except Exception:
+                pass  # Sin libro se usa el modelo fijo
+        return price
+
+    def create_order(self, symbol, side, type='MARKET', quantity=None, newClientOrderId=None, **params):
+        self.add_symbol(symbol.upper())
+        order = super().create_order(symbol, side, type, quantity, newClientOrderId, **params)
+        self.record(order)
+        return order
+
+    def record(self, order):
+        """Agrega la operación al libro contable en CSV"""
+        if not self.ledger_path:
+            return
+        fill = order['fills'][0]
+        row = {
+            'ts': order['transactTime'],
+            'symbol': order['symbol'],
+            'side': order['side'],
+            'quantity': order['executedQty'],
+            'price': fill['price'],
+            'quote_quantity': order['cummulativeQuoteQty'],
+            'commission': fill['commission'],
+            'quote_asset': fill['commissionAsset'],
+            'order_id': order['orderId'],
+            'client_order_id': order['clientOrderId'],
+        }
+        with self.ledger_lock:
+            new_file = not os.path.exists(self.ledger_path)
+            with open(self.ledger_path, 'a', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=LEDGER_FIELDS)
+                if new_file:
+                    writer.writeheader()
+                writer.writerow(row)
+
+
+def paper_backend(api_key=None, api_secret=None, price_service=None, market_client=None, **options):
+    """Backend 'paper': sin price_service usa el ticker masivo compartido y una cuenta por ledger"""
+    if price_service is not None:
+        return PaperExchange(price_service, market_client, **options)
+    market_client, price_service = market_data()
+    ledger_path = options.get('ledger_path', "paper_ledger.csv")
+    with shared_lock:
+        # Las opciones del primer bot definen la cuenta; los siguientes la reutilizan
+        if ledger_path not in shared_exchanges:
+            shared_exchanges[ledger_path] = PaperExchange(price_service, market_client, **options)
+        return shared_exchanges[ledger_path]
+
@@ -0,0 +1,113 @@
+import threading
+import time
+from price_stream import PriceStream
+
+
+class PriceService:
+    """Obtiene en una sola petición los precios de todos los símbolos seguidos y los reparte"""
+
+    def __init__(self, client=None, interval=1.0, max_age=5.0, log_callback=None):
+        self.client = client
+        self.interval = interval  # Segundos entre peticiones
+        self.max_age = max_age  # Antigüedad máxima (s) para considerar válido un precio
+        self.log_callback = log_callback
+        self.prices = {}  # symbol -> (price, timestamp)
+        self.subscribers = {}  # symbol -> [callback(price, timestamp)]
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+        else:
+            print(message)
+
+    def track(self, symbol):
+        with self.lock:
+            self.subscribers.setdefault(symbol.upper(), [])
+
+    def subscribe(self, symbol, callback):
+        with self.lock:
+            self.subscribers.setdefault(symbol.upper(), []).append(callback)
+
+    def unsubscribe(self, symbol, callback):
+        with self.lock:
+            callbacks = self.subscribers.get(symbol.upper(), [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def update(self, tickers, timestamp=None):
+        """Guarda los precios de un ticker masivo y notifica a los suscriptores"""
+        timestamp = timestamp or time.time()
+        with self.lock:
+            subscribers = {symbol: list(callbacks) for symbol, callbacks in self.subscribers.items()}
+        for ticker in tickers:
+            callbacks = subscribers.get(ticker['symbol'])
+            if callbacks is None:
+                continue
+            price = float(ticker['price'])
+            self.prices[ticker['symbol']] = (price, timestamp)
+            for callback in callbacks:
+                callback(price, timestamp)
+
+    def refresh(self):
+        """Una sola petición para todos los símbolos"""
+        self.update(self.client.get_all_tickers())
+
+    async def refresh_async(self, client):
+        self.update(await client.get_all_tickers())
+
+    def age(self, symbol):
+        entry = self.prices.get(symbol.upper())
+        return time.time() - entry[1] if entry else None
+
+    def is_stale(self, symbol):
+        age = self.age(symbol)
+        return age is None or age > self.max_age
+
+    def get(self, symbol):
+        """Último precio del símbolo, o None si no hay uno suficientemente reciente"""
+        if self.is_stale(symbol):
+            return None
+        return self.prices[symbol.upper()][0]
+
+    def stream(self, symbol):
+        """PriceStream alimentado por este servicio, para usar como price_stream de TradingBot"""
+        return ServicePriceStream(self, symbol, self.log_callback)
+
+    def start(self):
+        """Refresca los precios en segundo plano"""
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        next_time = time.monotonic()
+        while self.running:
+            try:
+                self.refresh()
+            except Exception as e:
+                self.log(f"Error al obtener precios: {e}")
+            next_time += self.interval
+            time.sleep(max(0, next_time - time.monotonic()))
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+
+class ServicePriceStream(PriceStream):
+    """Adapta una suscripción de PriceService a la interfaz PriceStream"""
+
+    def __init__(self, service, market, log_callback=None):
+        super().__init__(market, log_callback)
+        self.service = service
+
+    def connect(self):
+        self.service.subscribe(self.market, self.emit)
+
+    def stop(self):
+        self.service.unsubscribe(self.market, self.emit)
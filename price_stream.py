@@ -0,0 +1,148 @@
+import csv
+from abc import ABC, abstractmethod
+import threading
+import time
+
+
+class PriceStream(ABC):
+    """Fuente de precios por eventos: llama a callback(price, timestamp) en cada tick"""
+
+    def __init__(self, market, log_callback=None):
+        self.market = market.upper()
+        self.log_callback = log_callback
+        self.callback = None
+        self.last_seq = None
+        self.gaps = 0
+
+    def log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+        else:
+            print(message)
+
+    def start(self, callback):
+        self.callback = callback
+        self.connect()
+
+    @abstractmethod
+    def connect(self):
+        """Abre la conexión y empieza a llamar a emit"""
+
+    @abstractmethod
+    def stop(self):
+        """Cierra la conexión; reconnect la vuelve a abrir con connect"""
+
+    def reconnect(self):
+        """Cierra la conexión actual y abre una nueva"""
+        self.stop()
+        self.connect()
+
+    def emit(self, price, timestamp, seq=None, contiguous=True):
+        """Entrega un tick al bot descartando duplicados y detectando huecos de secuencia"""
+        if seq is not None and self.last_seq is not None:
+            if seq <= self.last_seq:
+                return
+            if contiguous and seq != self.last_seq + 1:
+                self.gaps += 1
+                self.log(f"Hueco en el stream de {self.market}: se perdieron {seq - self.last_seq - 1} eventos")
+        if seq is not None:
+            self.last_seq = seq
+        if self.callback:
+            self.callback(price, timestamp)
+
+
+class BinancePriceStream(PriceStream):
+    """Stream de Binance (trade o bookTicker) sobre ThreadedWebsocketManager"""
+
+    def __init__(self, market, api_key=None, api_secret=None, kind='trade', log_callback=None):
+        super().__init__(market, log_callback)
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.kind = kind
+        self.manager = None
+
+    def connect(self):
+        from binance import ThreadedWebsocketManager
+
+        # Los ids de secuencia cambian de origen al reconectar
+        self.last_seq = None
+        self.manager = ThreadedWebsocketManager(api_key=self.api_key, api_secret=self.api_secret)
+        self.manager.start()
+        if self.kind == 'bookTicker':
+            self.manager.start_symbol_book_ticker_socket(callback=self.on_message, symbol=self.market)
+        else:
+            self.manager.start_trade_socket(callback=self.on_message, symbol=self.market)
+
+    def stop(self):
+        if self.manager:
+            try:
+                self.manager.stop()
+            except Exception as e:
+                self.log(f"Error cerrando el stream: {e}")
+            self.manager = None
+
+    def on_message(self, msg):
+        """Convierte un mensaje del websocket en un tick"""
+        if msg.get('e') == 'error':
+            # El bot detecta la falta de ticks y reconecta
+            self.log(f"Error en el stream de {self.market}: {msg.get('m')}")
+            return
+        try:
+            if self.kind == 'bookTicker':
+                # Los ids de bookTicker son crecientes pero no contiguos
+                price = (float(msg['b']) + float(msg['a'])) / 2
+                self.emit(price, time.time(), msg.get('u'), contiguous=False)
+            else:
+                self.emit(float(msg['p']), msg['T'] / 1000, msg.get('t'))
+        except (KeyError, TypeError, ValueError) as e:
+            self.log(f"Mensaje de stream inválido: {e}")
+
+
+class FakePriceStream(PriceStream):
+    """Reproduce ticks grabados en un hilo local, para pruebas sin red"""
+
+    def __init__(self, market, ticks, speed=0, log_callback=None):
+        super().__init__(market, log_callback)
+        self.ticks = list(ticks)  # (timestamp, price) o (timestamp, price, seq)
+        self.speed = speed  # 0 = sin esperas, 1 = tiempo real, 10 = diez veces más rápido
+        self.position = 0
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    @classmethod
+    def from_csv(cls, market, path, speed=0, log_callback=None):
+        """Carga ticks de un CSV con columnas timestamp,price[,seq]"""
+        ticks = []
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                tick = (float(row['timestamp']), float(row['price']))
+                if row.get('seq'):
+                    tick += (int(row['seq']),)
+                ticks.append(tick)
+        return cls(market, ticks, speed, log_callback)
+
+    def connect(self):
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.replay, args=(self.stop_event,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def is_finished(self):
+        return self.position >= len(self.ticks)
+
+    def replay(self, stop_event):
+        previous_ts = None
+        while self.position < len(self.ticks) and not stop_event.is_set():
+            tick = self.ticks[self.position]
+            if self.speed and previous_ts is not None:
+                # Respeta los silencios grabados para poder simular cortes
+                if stop_event.wait((tick[0] - previous_ts) / self.speed):
+                    break
+            previous_ts = tick[0]
+            self.position += 1
+            self.emit(tick[1], tick[0], tick[2] if len(tick) > 2 else None)
@@ -0,0 +1,81 @@
+from decimal import Decimal, ROUND_DOWN
+import numpy as np
+
+
+class StepScale:
+    """Paso de un filtro (stepSize o tickSize) expresado como entero sobre una escala decimal"""
+
+    __slots__ = ('step', 'decimals', 'scale', 'step_units')
+
+    def __init__(self, step):
+        self.step = Decimal(str(step)).normalize()
+        if self.step <= 0:
+            raise ValueError(f"Paso inválido: {step}")
+        self.decimals = max(0, -self.step.as_tuple().exponent)
+        self.scale = 10 ** self.decimals
+        self.step_units = int(self.step * self.scale)  # El paso, en unidades de 10^-decimals
+
+    def floor_units(self, value):
+        """Cantidad de unidades enteras del mayor múltiplo del paso <= value"""
+        # str(float) es la representación decimal más corta: 0.1 se lee como 0.1 exacto
+        units = int((Decimal(str(value)) * self.scale).to_integral_value(rounding=ROUND_DOWN))
+        return units - units % self.step_units
+
+    def floor(self, value):
+        return Decimal(self.floor_units(value)).scaleb(-self.decimals)
+
+    def format(self, units):
+        """Texto con exactamente los decimales del paso, listo para la API"""
+        return format(Decimal(units).scaleb(-self.decimals), f'.{self.decimals}f')
+
+    def floor_batch(self, values):
+        """Versión vectorizada de floor_units para un array de valores"""
+        values = np.asarray(values, dtype=np.float64)
+        scaled = values * self.scale
+        units = np.floor(scaled).astype(np.int64)
+        # Pegado a un entero el float no alcanza para decidir: 0.29 * 1e8 queda 4e-9 abajo y 0.2999999999
+        # no es 0.30, así que ni una tolerancia fija ni redondear sirven. Esos pocos se calculan en Decimal
+        doubtful = np.flatnonzero(np.abs(scaled - np.rint(scaled)) <= np.maximum(1e-6, np.spacing(scaled) * 64))
+        units[doubtful] = [self.floor_units(value) for value in values[doubtful].tolist()]
+        return units - units % self.step_units
+
+    def from_units(self, units):
+        return np.asarray(units, dtype=np.int64) / self.scale
+
+
+def filter_step(symbol_filter, key, default='0.00000001'):
+    """Paso del filtro; Binance manda 0 cuando el filtro está deshabilitado"""
+    step = symbol_filter.get(key)
+    return step if step and Decimal(step) > 0 else default
+
+
+class SymbolScales:
+    """Escalas precalculadas de LOT_SIZE y PRICE_FILTER de un símbolo"""
+
+    __slots__ = ('lot', 'tick', 'min_qty_units', 'min_notional')
+
+    def __init__(self, filters):
+        lot_size = filters.get('LOT_SIZE') or {}
+        price_filter = filters.get('PRICE_FILTER') or {}
+        notional = filters.get('MIN_NOTIONAL') or {}
+        self.lot = StepScale(filter_step(lot_size, 'stepSize'))
+        self.tick = StepScale(filter_step(price_filter, 'tickSize'))
+        self.min_qty_units = self.lot.floor_units(lot_size.get('minQty', '0'))
+        self.min_notional = Decimal(notional.get('minNotional', '0'))
+
+    def quantity(self, value):
+        """Cantidad redondeada hacia abajo al stepSize, como texto"""
+        return self.lot.format(self.lot.floor_units(value))
+
+    def price(self, value):
+        """Precio redondeado hacia abajo al tickSize, como texto"""
+        return self.tick.format(self.tick.floor_units(value))
+
+    def is_tradable(self, quantity, price):
+        """Indica si la cantidad ya cuantizada cumple minQty y el nocional mínimo"""
+        units = self.lot.floor_units(quantity)
+        return units >= self.min_qty_units and units > 0 and self.lot.floor(quantity) * Decimal(str(price)) >= self.min_notional
+
+    def quantities(self, values):
+        """Cuantiza un lote de cantidades; devuelve floats exactos al paso"""
+        return self.lot.from_units(self.lot.floor_batch(values))
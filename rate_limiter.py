@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+from metrics import NULL_METRICS
+
+# Peso de cada endpoint según la documentación de Binance Spot
+ENDPOINT_WEIGHTS = {
+    'get_symbol_ticker': 2,
+    'get_all_tickers': 4,
+    'get_exchange_info': 20,
+    'get_order_book': 5,
+    'get_order': 4,
+    'get_account': 20,
+    'get_asset_balance': 20,
+    'create_order': 1,
+    'order_market_buy': 1,
+    'order_market_sell': 1,
+}
+ORDER_ENDPOINTS = {'create_order', 'order_market_buy', 'order_market_sell'}
+
+
+class TokenBucket:
+    def __init__(self, capacity, rate):
+        self.capacity = capacity
+        self.rate = rate  # Tokens por segundo
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, floor=0):
+        """Segundos hasta poder tomar amount dejando al menos floor tokens"""
+        missing = amount + floor - self.tokens
+        return max(0.0, missing / self.rate)
+
+
+class WeightLimiter:
+    """Presupuesto de peso compartido por todos los bots del proceso; las órdenes tienen prioridad"""
+
+    def __init__(self, weight_per_minute=6000, orders_per_10s=50, order_reserve=0.2, metrics=None):
+        self.weight = TokenBucket(weight_per_minute, weight_per_minute / 60)
+        self.orders = TokenBucket(orders_per_10s, orders_per_10s / 10)
+        # Fracción del presupuesto que las lecturas no pueden usar, reservada para órdenes
+        self.order_reserve = order_reserve
+        self.metrics = metrics or NULL_METRICS
+        self.waiting_orders = 0
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+
+    def try_acquire(self, endpoint):
+        """Toma el peso si hay presupuesto; si no, devuelve los segundos a esperar (con el lock tomado)"""
+        weight = ENDPOINT_WEIGHTS.get(endpoint, 1)
+        self.weight.refill()
+        if endpoint in ORDER_ENDPOINTS:
+            self.orders.refill()
+            wait = max(self.weight.wait_time(weight), self.orders.wait_time(1))
+            if wait == 0:
+                self.weight.tokens -= weight
+                self.orders.tokens -= 1
+        else:
+            if self.waiting_orders:
+                # Las lecturas ceden el paso mientras haya órdenes esperando
+                wait = 0.01
+            else:
+                wait = self.weight.wait_time(weight, self.order_reserve * self.weight.capacity)
+                if wait == 0:
+                    self.weight.tokens -= weight
+        # También al esperar: cada intento reporta el presupuesto recién recargado
+        self.report()
+        return wait
+
+    def acquire(self, endpoint):
+        """Bloquea hasta que haya presupuesto para el endpoint"""
+        is_order = endpoint in ORDER_ENDPOINTS
+        with self.cond:
+            if is_order:
+                self.waiting_orders += 1
+            try:
+                while True:
+                    wait = self.try_acquire(endpoint)
+                    if wait == 0:
+                        return
+                    self.cond.wait(wait)
+            finally:
+                if is_order:
+                    self.waiting_orders -= 1
+                    self.cond.notify_all()
+
+    async def acquire_async(self, endpoint):
+        is_order = endpoint in ORDER_ENDPOINTS
+        with self.lock:
+            if is_order:
+                self.waiting_orders += 1
+        try:
+            while True:
+                with self.lock:
+                    wait = self.try_acquire(endpoint)
+                if wait == 0:
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            if is_order:
+                with self.cond:
+                    self.waiting_orders -= 1
+                    self.cond.notify_all()
+
+    def sync(self, used_weight):
+        """Ajusta el presupuesto al peso usado que informa Binance (x-mbx-used-weight-1m)"""
+        with self.lock:
+            self.weight.refill()
+            self.weight.tokens = min(self.weight.tokens, self.weight.capacity - used_weight)
+            self.report()
+
+    def utilization(self):
+        return 1 - max(0.0, self.weight.tokens) / self.weight.capacity
+
+    def report(self):
+        self.metrics.set_gauge('rate_limit_utilization', self.utilization())
+
+
+class RateLimitedClient:
+    """Envuelve un cliente síncrono y pide presupuesto antes de cada llamada conocida"""
+
+    def __init__(self, client, limiter):
+        self.client = client
+        self.limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name not in ENDPOINT_WEIGHTS:
+            return attr
+
+        def call(*args, **kwargs):
+            self.limiter.acquire(name)
+            result = attr(*args, **kwargs)
+            response = getattr(self.client, 'response', None)
+            used_weight = response.headers.get('x-mbx-used-weight-1m') if response is not None else None
+            if used_weight:
+                self.limiter.sync(int(used_weight))
+            return result
+        return call
+
+
+class AsyncRateLimitedClient:
+    """Igual que RateLimitedClient para clientes asíncronos"""
+
+    def __init__(self, client, limiter):
+        self.client = client
+        self.limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name not in ENDPOINT_WEIGHTS:
+            return attr
+
+        async def call(*args, **kwargs):
+            await self.limiter.acquire_async(name)
+            result = await attr(*args, **kwargs)
+            response = getattr(self.client, 'response', None)
+            used_weight = response.headers.get('x-mbx-used-weight-1m') if response is not None else None
+            if used_weight:
+                self.limiter.sync(int(used_weight))
+            return result
+        return call
+
+
+# Limitador único para todos los bots del proceso
+limiter = WeightLimiter()
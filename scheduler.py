@@ -0,0 +1,58 @@
+import threading
+import time
+
+
+class AdaptiveScheduler:
+    """Decide cuánto esperar entre ciclos según la cercanía a un disparo y la presión de rate limit"""
+
+    def __init__(self, base_interval, min_interval=None, max_interval=None, near_distance=0.002, far_distance=0.02,
+                 weight_limit=6000, weight_threshold=0.7):
+        self.base_interval = base_interval  # Segundos; es el intervalo si no se conoce la distancia
+        self.min_interval = min_interval if min_interval is not None else base_interval / 4
+        self.max_interval = max_interval if max_interval is not None else base_interval * 4
+        self.near_distance = near_distance  # Distancia relativa al umbral por debajo de la cual se sondea al mínimo
+        self.far_distance = far_distance  # Distancia a partir de la cual se sondea al máximo
+        self.weight_limit = weight_limit  # Peso por minuto permitido por Binance
+        self.weight_threshold = weight_threshold  # Fracción de uso a partir de la cual se frena
+        self.pressure = 0.0
+        self.deadline = None
+        self.stop_event = threading.Event()
+
+    def observe_weight(self, used_weight):
+        """Registra el peso usado en el último minuto (cabecera x-mbx-used-weight-1m)"""
+        self.pressure = used_weight / self.weight_limit
+
+    def interval_for(self, distance):
+        """Intervalo para una distancia relativa al umbral más cercano"""
+        if distance is None:
+            interval = self.base_interval
+        elif distance <= self.near_distance:
+            interval = self.min_interval
+        elif distance >= self.far_distance:
+            interval = self.max_interval
+        else:
+            ratio = (distance - self.near_distance) / (self.far_distance - self.near_distance)
+            interval = self.min_interval + ratio * (self.max_interval - self.min_interval)
+        if self.pressure > self.weight_threshold:
+            # Hasta 4 veces más lento a medida que el uso se acerca al límite
+            backoff = 1 + 3 * min(1.0, (self.pressure - self.weight_threshold) / (1 - self.weight_threshold))
+            interval = max(interval, self.base_interval) * backoff
+        return interval
+
+    def wait(self, distance=None):
+        """Espera hasta el próximo ciclo; devuelve False si se canceló"""
+        now = time.monotonic()
+        interval = self.interval_for(distance)
+        # Plazos absolutos: la duración del ciclo se descuenta de la espera y no se acumula deriva
+        self.deadline = (self.deadline or now) + interval
+        if self.deadline < now:
+            # Ciclo más largo que el intervalo: seguir de inmediato sin ráfagas para recuperar
+            self.deadline = now
+        return not self.stop_event.wait(self.deadline - now)
+
+    def reset(self):
+        self.deadline = None
+        self.stop_event.clear()
+
+    def cancel(self):
+        self.stop_event.set()
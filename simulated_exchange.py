@@ -0,0 +1,241 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+from decimal import Decimal
+
+DEFAULT_FILTERS = {'stepSize': '0.00001', 'minQty': '0.00001', 'maxQty': '9000000', 'tickSize': '0.01', 'minNotional': '5'}
+OPEN_STATUSES = ('NEW', 'PARTIALLY_FILLED')
+
+
+class SimulatedAPIException(Exception):
+    """Imita a BinanceAPIException (atributos code y message)"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def __str__(self):
+        return f"APIError(code={self.code}): {self.message}"
+
+
+class SimulatedExchange:
+    """Exchange en memoria con la interfaz de binance.client.Client que usan los bots"""
+
+    needs_rate_limit = False  # No hace peticiones reales: no consume el presupuesto de peso
+
+    def __init__(self, prices=None, symbols=None, balances=None, latency=0.0, latency_jitter=0.0,
+                 fill_ratio=1.0, reject_rate=0.0, slippage=0.0, fee=0.001, advance_on_read=True, seed=None,
+                 book_quantity=1.0, book_spacing=0.0005):
+        self.feeds = {symbol.upper(): list(feed) for symbol, feed in (prices or {}).items()}
+        self.positions = {symbol: 0 for symbol in self.feeds}
+        self.read_once = set()  # Símbolos cuyo tick actual ya fue leído
+        # Filtros por símbolo; los que no se indiquen usan DEFAULT_FILTERS
+        self.symbols = {}
+        for symbol in set(self.feeds) | set(s.upper() for s in (symbols or {})):
+            self.symbols[symbol] = dict(DEFAULT_FILTERS, **(symbols or {}).get(symbol, {}))
+        self.balances = dict(balances or {'USDT': 10000.0})
+        self.latency = latency  # Segundos por llamada
+        self.latency_jitter = latency_jitter
+        self.fill_ratio = fill_ratio  # Fracción ejecutada de cada orden de mercado
+        self.reject_rate = reject_rate  # Probabilidad de rechazo aleatorio
+        self.slippage = slippage  # Desvío del precio de ejecución (0.001 = 0.1 %)
+        self.fee = fee
+        self.advance_on_read = advance_on_read  # Cada lectura de precio avanza un tick
+        self.book_quantity = book_quantity  # Cantidad en cada nivel del libro sintético
+        self.book_spacing = book_spacing  # Distancia relativa entre niveles
+        self.book_updates = itertools.count(1)
+        self.blocking = True  # False cuando la latencia la simula AsyncSimulatedExchange
+        self.rng = random.Random(seed)
+        self.order_ids = itertools.count(1)
+        self.orders = {}
+        self.lock = threading.Lock()
+
+    def sample_latency(self):
+        return self.latency + (self.rng.uniform(0, self.latency_jitter) if self.latency_jitter else 0)
+
+    def delay(self):
+        if self.blocking and (self.latency or self.latency_jitter):
+            time.sleep(self.sample_latency())
+
+    def set_price(self, symbol, price):
+        """Fija el precio actual de un símbolo (agrega el símbolo si no existe)"""
+        symbol = symbol.upper()
+        with self.lock:
+            self.feeds[symbol] = [price]
+            self.positions[symbol] = 0
+            self.read_once.discard(symbol)
+            self.symbols.setdefault(symbol, dict(DEFAULT_FILTERS))
+
+    def advance(self, symbol=None, steps=1):
+        """Avanza el feed de un símbolo (o de todos); devuelve False al agotarse"""
+        with self.lock:
+            symbols = [symbol.upper()] if symbol else list(self.feeds)
+            for s in symbols:
+                self.positions[s] = min(self.positions[s] + steps, len(self.feeds[s]) - 1)
+            return any(self.positions[s] < len(self.feeds[s]) - 1 for s in symbols)
+
+    def current_price(self, symbol):
+        symbol = symbol.upper()
+        if symbol not in self.feeds:
+            raise SimulatedAPIException(-1121, "Invalid symbol.")
+        return float(self.feeds[symbol][self.positions[symbol]])
+
+    def read_price(self, symbol):
+        # Se avanza antes de leer, así las órdenes se ejecutan al último precio leído
+        symbol = symbol.upper()
+        if self.advance_on_read:
+            if symbol in self.read_once:
+                self.advance(symbol)
+            self.read_once.add(symbol)
+        return self.current_price(symbol)
+
+    # --- Datos de mercado ---
+
+    def get_symbol_ticker(self, symbol=None, **params):
+        self.delay()
+        if symbol is None:
+            return [{'symbol': s, 'price': str(self.read_price(s))} for s in self.feeds]
+        return {'symbol': symbol.upper(), 'price': str(self.read_price(symbol))}
+
+    def get_all_tickers(self):
+        return self.get_symbol_ticker()
+
+    def get_order_book(self, symbol, limit=100, **params):
+        """Libro sintético alrededor del precio actual (sin avanzar el feed)"""
+        self.delay()
+        price = self.current_price(symbol)
+        levels = range(1, min(limit, 5000) + 1)
+        return {
+            'lastUpdateId': next(self.book_updates),
+            'bids': [[f"{price * (1 - self.book_spacing * i):.8f}", str(self.book_quantity)] for i in levels],
+            'asks': [[f"{price * (1 + self.book_spacing * i):.8f}", str(self.book_quantity)] for i in levels],
+        }
+
+    def get_exchange_info(self):
+        self.delay()
+        symbols = []
+        for symbol, f in self.symbols.items():
+            symbols.append({
+                'symbol': symbol,
+                'status': 'TRADING',
+                'quoteAsset': f.get('quoteAsset', 'USDT'),
+                'filters': [
+                    {'filterType': 'PRICE_FILTER', 'minPrice': f['tickSize'], 'maxPrice': '1000000', 'tickSize': f['tickSize']},
+                    {'filterType': 'LOT_SIZE', 'minQty': f['minQty'], 'maxQty': f['maxQty'], 'stepSize': f['stepSize']},
+                    {'filterType': 'NOTIONAL', 'minNotional': f['minNotional']},
+                ],
+            })
+        return {'symbols': symbols}
+
+    # --- Órdenes ---
+
+    def check_filters(self, symbol, quantity):
+        f = self.symbols[symbol]
+        qty = Decimal(str(quantity))
+        if qty < Decimal(f['minQty']) or qty > Decimal(f['maxQty']):
+            raise SimulatedAPIException(-1013, "Filter failure: LOT_SIZE")
+        if (qty - Decimal(f['minQty'])) % Decimal(f['stepSize']) != 0:
+            raise SimulatedAPIException(-1013, "Filter failure: LOT_SIZE")
+        if float(qty) * self.current_price(symbol) < float(f['minNotional']):
+            raise SimulatedAPIException(-1013, "Filter failure: NOTIONAL")
+
+    def fill_price(self, symbol, side, quantity):
+        """Precio de ejecución: el actual desviado por slippage en contra de la orden"""
+        direction = 1 if side == 'BUY' else -1
+        return self.current_price(symbol) * (1 + direction * self.slippage)
+
+    def create_order(self, symbol, side, type='MARKET', quantity=None, newClientOrderId=None, **params):
+        self.delay()
+        symbol = symbol.upper()
+        if type != 'MARKET':
+            raise SimulatedAPIException(-1116, "Invalid orderType.")
+        with self.lock:
+            # Como Binance: el client id solo se rechaza mientras la orden anterior sigue abierta
+            if newClientOrderId and any(o['clientOrderId'] == newClientOrderId and o['status'] in OPEN_STATUSES
+                                        for o in self.orders.values()):
+                raise SimulatedAPIException(-2010, "Duplicate order sent.")
+            self.check_filters(symbol, quantity)
+            if self.reject_rate and self.rng.random() < self.reject_rate:
+                raise SimulatedAPIException(-2010, "Order rejected by simulator.")
+
+            quote = self.symbols[symbol].get('quoteAsset', 'USDT')
+            base = symbol[:-len(quote)]
+            requested = float(quantity)
+            executed = requested * self.fill_ratio
+            price = self.fill_price(symbol, side, executed)
+            quote_qty = executed * price
+            commission = quote_qty * self.fee
+            if side == 'BUY':
+                if self.balances.get(quote, 0.0) < quote_qty + commission:
+                    raise SimulatedAPIException(-2010, "Account has insufficient balance for requested action.")
+                self.balances[quote] = self.balances.get(quote, 0.0) - quote_qty - commission
+                self.balances[base] = self.balances.get(base, 0.0) + executed
+            else:
+                if self.balances.get(base, 0.0) < executed:
+                    raise SimulatedAPIException(-2010, "Account has insufficient balance for requested action.")
+                self.balances[base] -= executed
+                self.balances[quote] = self.balances.get(quote, 0.0) + quote_qty - commission
+
+            order_id = next(self.order_ids)
+            order = {
+                'symbol': symbol,
+                'orderId': order_id,
+                'clientOrderId': newClientOrderId or f"sim-{order_id}",
+                'transactTime': int(time.time() * 1000),
+                'price': '0.00000000',
+                'origQty': str(requested),
+                'executedQty': str(executed),
+                'cummulativeQuoteQty': str(quote_qty),
+                'status': 'FILLED' if executed == requested else 'EXPIRED',
+                'type': 'MARKET',
+                'side': side,
+                'fills': [{'price': str(price), 'qty': str(executed), 'commission': str(commission), 'commissionAsset': quote}],
+            }
+            self.orders[order_id] = order
+            return order
+
+    def order_market_buy(self, **params):
+        return self.create_order(side='BUY', type='MARKET', **params)
+
+    def order_market_sell(self, **params):
+        return self.create_order(side='SELL', type='MARKET', **params)
+
+    def get_order(self, symbol, orderId=None, origClientOrderId=None, **params):
+        self.delay()
+        # El client id puede repetirse en órdenes ya cerradas: gana la más reciente
+        for order in reversed(list(self.orders.values())):
+            if order['orderId'] == orderId or (origClientOrderId and order['clientOrderId'] == origClientOrderId):
+                return order
+        raise SimulatedAPIException(-2013, "Order does not exist.")
+
+    def get_asset_balance(self, asset):
+        self.delay()
+        return {'asset': asset, 'free': str(self.balances.get(asset, 0.0)), 'locked': '0.0'}
+
+    def get_account(self):
+        self.delay()
+        return {'balances': [{'asset': a, 'free': str(v), 'locked': '0.0'} for a, v in self.balances.items()]}
+
+
+class AsyncSimulatedExchange:
+    """Versión asíncrona para AsyncBotEngine: la latencia se simula con asyncio.sleep"""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        exchange.blocking = False
+
+    def __getattr__(self, name):
+        method = getattr(self.exchange, name)
+
+        async def call(*args, **kwargs):
+            latency = self.exchange.sample_latency()
+            if latency:
+                await asyncio.sleep(latency)
+            return method(*args, **kwargs)
+        return call
+
+    async def close_connection(self):
+        pass
@@ -0,0 +1,104 @@
+import sqlite3
+import threading
+import time
+
+
+class StateStore:
+    """Diario de posiciones en SQLite (WAL) con commits agrupados entre todos los bots"""
+
+    def __init__(self, path="bot_state.db"):
+        self.path = path
+        self.db_lock = threading.Lock()  # La conexión se comparte entre el escritor y compact
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # fsync en cada commit; como los commits se agrupan, el costo se reparte entre bots
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS journal (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                last_buy_price REAL,
+                martingale_multiplier INTEGER NOT NULL,
+                ts REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS journal_symbol_seq ON journal (symbol, seq)")
+        self.positions = self.load()
+        self.compact()  # Lo recuperado ya está en memoria: el resto del diario sobra
+        self.pending = []
+        self.batch = 0  # Lote que se está juntando
+        self.committed = -1  # Último lote guardado en disco
+        self.error = None
+        self.closing = False
+        self.cond = threading.Condition()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def load(self):
+        """Último estado de cada símbolo"""
+        rows = self.conn.execute("""
+            SELECT j.symbol, j.last_buy_price, j.martingale_multiplier
+            FROM journal j
+            JOIN (SELECT symbol, MAX(seq) AS seq FROM journal GROUP BY symbol) latest ON j.seq = latest.seq
+        """).fetchall()
+        return {symbol: (last_buy_price, multiplier) for symbol, last_buy_price, multiplier in rows}
+
+    def restore(self, symbol):
+        """(last_buy_price, martingale_multiplier) guardado para el símbolo, o None"""
+        return self.positions.get(symbol)
+
+    def record(self, symbol, last_buy_price, martingale_multiplier, sync=True):
+        """Agrega el nuevo estado al diario; con sync=True espera a que esté en disco"""
+        with self.cond:
+            if self.error:
+                raise Exception(f"Error guardando estado: {self.error}")
+            self.positions[symbol] = (last_buy_price, martingale_multiplier)
+            self.pending.append((symbol, last_buy_price, martingale_multiplier, time.time()))
+            batch = self.batch
+            self.cond.notify_all()
+            if sync:
+                while self.committed < batch and not self.error:
+                    self.cond.wait()
+                if self.error:
+                    raise Exception(f"Error guardando estado: {self.error}")
+
+    def write_loop(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closing:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+                # Lo que llegue mientras se hace este fsync va junto en el próximo commit
+                rows, self.pending = self.pending, []
+                batch = self.batch
+                self.batch += 1
+            try:
+                with self.db_lock:
+                    self.conn.execute("BEGIN")
+                    self.conn.executemany(
+                        "INSERT INTO journal (symbol, last_buy_price, martingale_multiplier, ts) VALUES (?, ?, ?, ?)", rows)
+                    self.conn.execute("COMMIT")
+            except Exception as e:
+                with self.cond:
+                    self.error = e
+                    self.cond.notify_all()
+                return
+            with self.cond:
+                self.committed = batch
+                self.cond.notify_all()
+
+    def compact(self):
+        """Borra las entradas superadas, dejando solo el último estado de cada símbolo"""
+        with self.db_lock:
+            self.conn.execute("DELETE FROM journal WHERE seq NOT IN (SELECT MAX(seq) FROM journal GROUP BY symbol)")
+
+    def close(self):
+        with self.cond:
+            self.closing = True
+            self.cond.notify_all()
+        self.writer.join()
+        try:
+            if not self.error:
+                self.compact()
+        finally:
+            self.conn.close()
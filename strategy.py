@@ -0,0 +1,90 @@
+from collections import namedtuple
+
+BUY = 'BUY'
+SELL = 'SELL'
+RESET = 'RESET'  # Límite de martingala alcanzado: solo se reinicia el multiplicador
+
+# Acción que la estrategia pide ejecutar ante un precio
+Decision = namedtuple('Decision', ['action', 'quantity', 'price', 'reason'])
+
+
+class MartingaleStrategy:
+    """Reglas de compra/venta de TradingBot, sin acceso a la red"""
+
+    def __init__(self, market, buy_amount, max_drop_percent, target_increment, alcista_increment, martingale_limit, gates=None):
+        self.market = market.upper()
+        self.buy_amount = buy_amount
+        self.max_drop_percent = max_drop_percent
+        self.target_increment = target_increment
+        self.alcista_increment = alcista_increment
+        self.martingale_limit = martingale_limit
+        self.last_buy_price = None
+        self.martingale_multiplier = 1
+        # Filtros opcionales de indicators.py; ven todos los ticks y pueden vetar una decisión
+        self.gates = list(gates or [])
+
+    def decide(self, current_price):
+        """Devuelve la Decision para el precio actual, o None si no hay que operar"""
+        for gate in self.gates:
+            gate.update(current_price)
+        decision = self.rules(current_price)
+        if decision and not all(gate.allows(decision) for gate in self.gates):
+            return None
+        return decision
+
+    def rules(self, current_price):
+        """Reglas de martingala sin filtros"""
+        # Primera compra si no existe un precio previo
+        if not self.last_buy_price:
+            return Decision(BUY, self.buy_amount / current_price, current_price, 'primera')
+
+        increment = (current_price - self.last_buy_price) / self.last_buy_price
+        drop = (self.last_buy_price - current_price) / self.last_buy_price
+
+        if increment >= self.target_increment:
+            return Decision(SELL, self.buy_amount / self.last_buy_price, current_price, 'objetivo')
+        if drop >= self.max_drop_percent:
+            return self.escalate(current_price, 'caida')
+        if increment >= self.alcista_increment:
+            return self.escalate(current_price, 'alcista')
+        return None
+
+    def distance_to_trigger(self, current_price):
+        """Distancia relativa entre el precio y el umbral más cercano (0 = dispara ya); None sin posición"""
+        if not self.last_buy_price:
+            # Sin posición no hay umbral cerca: si la primera compra falla, se reintenta al ritmo base
+            return None
+        increment = (current_price - self.last_buy_price) / self.last_buy_price
+        to_rise = min(self.target_increment, self.alcista_increment) - increment
+        to_drop = self.max_drop_percent + increment
+        return max(0.0, min(to_rise, to_drop))
+
+    def escalate(self, current_price, reason):
+        """Compra adicional con el multiplicador de martingala vigente"""
+        if self.martingale_multiplier <= self.martingale_limit:
+            quantity = (self.buy_amount * self.martingale_multiplier) / current_price
+            return Decision(BUY, quantity, current_price, reason)
+        return Decision(RESET, 0, current_price, reason)
+
+    def apply(self, decision, filled):
+        """Actualiza el estado según el resultado de la orden"""
+        if decision.action == SELL:
+            self.last_buy_price = None  # Reiniciar después de vender
+            self.martingale_multiplier = 1
+        elif decision.action == RESET:
+            self.martingale_multiplier = 1
+        elif filled:
+            if decision.reason != 'primera':
+                self.martingale_multiplier *= 2
+            self.last_buy_price = decision.price
+
+
+def describe(decision, market):
+    """Mensaje de log que acompaña a cada decisión"""
+    if decision.reason == 'primera':
+        return f"Comprando {market} a {decision.price}"
+    if decision.reason == 'objetivo':
+        return f"Vendiendo {market} a {decision.price}"
+    if decision.reason == 'caida':
+        return f"Comprando más {market} a {decision.price} debido a caída"
+    return f"Comprando más {market} a {decision.price} debido a tendencia alcista"
@@ -0,0 +1,123 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from backtest import backtest, load_prices, BacktestResult
+
+PARAMS = ('max_drop_percent', 'target_increment', 'alcista_increment', 'martingale_limit')
+
+# Precios del proceso worker: vista de solo lectura sobre un .npy mapeado en memoria
+worker_prices = None
+
+
+def grid_search(space):
+    """Todas las combinaciones de los valores de cada parámetro"""
+    for values in itertools.product(*(space[name] for name in PARAMS)):
+        yield dict(zip(PARAMS, values))
+
+
+def random_search(space, samples, seed=None):
+    """Muestras uniformes entre el mínimo y el máximo de cada parámetro"""
+    rng = random.Random(seed)
+    for _ in range(samples):
+        params = {}
+        for name in PARAMS:
+            low, high = min(space[name]), max(space[name])
+            params[name] = rng.randint(low, high) if name == 'martingale_limit' else rng.uniform(low, high)
+        yield params
+
+
+def init_worker(path):
+    global worker_prices
+    # Todos los workers comparten las mismas páginas del page cache, sin copiar ni serializar
+    worker_prices = np.load(path, mmap_mode='r')
+
+
+def run_backtest(params, fee):
+    return params, backtest(worker_prices, params, fee)
+
+
+def sweep(prices, combinations, buy_amount, fee=0.001, workers=None, output=None, on_result=None):
+    """Ejecuta los backtests en paralelo y devuelve las filas de resultados"""
+    workers = workers or os.cpu_count()
+    tmp_dir = tempfile.TemporaryDirectory(prefix='sweep-')
+    prices_path = os.path.join(tmp_dir.name, 'prices.npy')
+    np.save(prices_path, np.ascontiguousarray(prices, dtype=np.float64))
+    rows = []
+    out_file = open(output, 'w', newline='') if output else None
+    writer = None
+    if out_file:
+        writer = csv.DictWriter(out_file, fieldnames=list(PARAMS) + list(BacktestResult._fields))
+        writer.writeheader()
+    try:
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(prices_path,)) as pool:
+            combinations = iter(combinations)
+            pending = set()
+            while True:
+                # Pocas tareas en vuelo para no materializar toda la grilla en memoria
+                for params in itertools.islice(combinations, workers * 4 - len(pending)):
+                    pending.add(pool.submit(run_backtest, dict(params, buy_amount=buy_amount), fee))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    params, result = future.result()
+                    row = {name: params[name] for name in PARAMS}
+                    row.update(result._asdict())
+                    rows.append(row)
+                    if writer:
+                        writer.writerow(row)
+                        out_file.flush()
+                    if on_result:
+                        on_result(row)
+    finally:
+        if out_file:
+            out_file.close()
+        tmp_dir.cleanup()
+    return rows
+
+
+def print_table(rows, sort_by='pnl', top=20, ascending=False):
+    columns = list(PARAMS) + ['pnl', 'max_drawdown', 'escalations', 'max_exposure', 'sells']
+    rows = sorted(rows, key=lambda r: r[sort_by], reverse=not ascending)[:top]
+    print(" | ".join(f"{c:>17}" for c in columns))
+    for row in rows:
+        print(" | ".join(f"{row[c]:>17.6g}" if isinstance(row[c], float) else f"{row[c]:>17}" for c in columns))
+
+
+def parse_values(text, cast=float):
+    return [cast(v) for v in text.split(',')]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Búsqueda de parámetros de TradingBot sobre datos históricos")
+    parser.add_argument('prices', help="CSV o Parquet de ticks/klines")
+    parser.add_argument('--buy-amount', type=float, default=10.0)
+    parser.add_argument('--max-drop', default='0.01,0.02,0.03,0.05')
+    parser.add_argument('--target', default='0.01,0.02,0.03,0.05')
+    parser.add_argument('--alcista', default='0.01,0.02,0.05,0.1')
+    parser.add_argument('--limit', default='1,2,4,8,16')
+    parser.add_argument('--random', type=int, default=0, help="Cantidad de muestras aleatorias (0 = grilla)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--fee', type=float, default=0.001)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='sweep_resultados.csv')
+    parser.add_argument('--sort', default='pnl')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    space = {
+        'max_drop_percent': parse_values(args.max_drop),
+        'target_increment': parse_values(args.target),
+        'alcista_increment': parse_values(args.alcista),
+        'martingale_limit': parse_values(args.limit, int),
+    }
+    combinations = random_search(space, args.random, args.seed) if args.random else grid_search(space)
+    _, prices = load_prices(args.prices)
+    results = sweep(prices, combinations, args.buy_amount, args.fee, args.workers, args.output,
+                    on_result=lambda row: print(f"pnl={row['pnl']:.4f} {[row[p] for p in PARAMS]}"))
+    print_table(results, args.sort, args.top, ascending=args.sort == 'max_drawdown')
@@ -0,0 +1,29 @@
+from bot_logic import TradingBot
+from exchange_filters import filters_cache
+from simulated_exchange import SimulatedExchange
+
+
+def make_bot(exchange, logs):
+    return TradingBot('BTCUSDT', 20.0, 0.02, 0.02, 0.05, None, None, 50, 4, log_callback=logs.append, client=exchange)
+
+
+def test_order_below_min_notional_is_not_sent():
+    filters_cache.invalidate()
+    exchange = SimulatedExchange(prices={'BTCUSDT': [100.0]}, balances={'USDT': 1000.0})
+    logs = []
+    bot = make_bot(exchange, logs)
+    bot.last_price = 100.0
+    filters_cache.get(exchange, 'BTCUSDT')
+    assert bot.market_buy(0.01) is None  # 1 USDT, debajo del nocional mínimo de 5
+    assert not exchange.orders
+    assert not filters_cache.is_expired()  # Un rechazo local no recarga los filtros
+    assert any("no se envía" in m for m in logs)
+
+
+def test_order_above_min_notional_is_sent():
+    filters_cache.invalidate()
+    exchange = SimulatedExchange(prices={'BTCUSDT': [100.0]}, balances={'USDT': 1000.0})
+    bot = make_bot(exchange, [])
+    bot.last_price = 100.0
+    assert bot.market_buy(0.1)['status'] == 'FILLED'
+    assert len(exchange.orders) == 1
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+import order_executor
+from order_executor import OrderExecutor, AsyncOrderExecutor, OrderStatusUnknown
+from simulated_exchange import SimulatedExchange, AsyncSimulatedExchange
+
+
+class FlakyExchange(SimulatedExchange):
+    """El primer envío da timeout; fill_first decide si la orden se ejecutó antes del timeout"""
+
+    def __init__(self, fill_first=False, visible_after=0, **options):
+        super().__init__(prices={'BTCUSDT': [100.0]}, balances={'USDT': 1000.0}, fee=0.0, **options)
+        self.fill_first = fill_first
+        self.visible_after = visible_after  # Consultas que devuelven -2013 antes de ver la orden
+        self.create_calls = 0
+        self.lookups = 0
+
+    def create_order(self, symbol, side, type='MARKET', quantity=None, newClientOrderId=None, **params):
+        self.create_calls += 1
+        if self.create_calls == 1:
+            if self.fill_first:
+                super().create_order(symbol, side, type, quantity, newClientOrderId, **params)
+            raise TimeoutError("Read timed out")
+        return super().create_order(symbol, side, type, quantity, newClientOrderId, **params)
+
+    def get_order(self, symbol, orderId=None, origClientOrderId=None, **params):
+        self.lookups += 1
+        if self.lookups <= self.visible_after:
+            return super().get_order(symbol, orderId, None, **params)  # Todavía no visible: -2013
+        return super().get_order(symbol, orderId, origClientOrderId, **params)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(order_executor, 'backoff', lambda attempt, base=0.2, cap=5.0: 0)
+
+
+def test_filled_then_timeout_is_not_resent():
+    exchange = FlakyExchange(fill_first=True, visible_after=2)
+    executor = OrderExecutor(exchange, log_callback=lambda message: None)
+    order = executor.place('BTCUSDT', 'BUY', 1.0)
+    assert order['status'] == 'FILLED'
+    assert exchange.create_calls == 1
+    assert len(exchange.orders) == 1
+    assert exchange.balances['USDT'] == pytest.approx(900.0)
+
+
+def test_unconfirmed_order_raises_status_unknown_without_resending():
+    exchange = FlakyExchange(fill_first=False)
+    executor = OrderExecutor(exchange, log_callback=lambda message: None)
+    with pytest.raises(OrderStatusUnknown):
+        executor.place('BTCUSDT', 'BUY', 1.0)
+    assert exchange.create_calls == 1
+    assert not exchange.orders
+
+
+def test_async_filled_then_timeout_is_not_resent():
+    exchange = FlakyExchange(fill_first=True, visible_after=2)
+    executor = AsyncOrderExecutor(AsyncSimulatedExchange(exchange), log_callback=lambda message: None)
+    order = asyncio.run(executor.place('BTCUSDT', 'BUY', 1.0))
+    assert order['status'] == 'FILLED'
+    assert exchange.create_calls == 1
+    assert len(exchange.orders) == 1
+
+
+def test_simulator_accepts_client_id_again_once_filled():
+    exchange = SimulatedExchange(prices={'BTCUSDT': [100.0]}, balances={'USDT': 1000.0})
+    exchange.create_order('BTCUSDT', 'BUY', quantity=1.0, newClientOrderId='abc')
+    exchange.create_order('BTCUSDT', 'BUY', quantity=1.0, newClientOrderId='abc')
+    assert len(exchange.orders) == 2
@@ -0,0 +1,58 @@
+import threading
+import time
+import pytest
+from bot_logic import TradingBot
+from exchange_filters import filters_cache
+from price_stream import PriceStream, FakePriceStream
+from simulated_exchange import SimulatedExchange
+
+
+class CountingFakeStream(FakePriceStream):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connects = 0
+
+    def connect(self):
+        self.connects += 1
+        super().connect()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_subclass_without_connect_and_stop_fails_on_creation():
+    class Incomplete(PriceStream):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete('BTCUSDT')
+
+
+def test_run_stream_gap_fallback_and_reconnect():
+    filters_cache.invalidate()
+    # seq 3 nunca llega (hueco) y después hay 1.5 s de silencio grabado
+    ticks = [(0.00, 100.0, 1), (0.01, 100.1, 2), (0.02, 100.2, 4), (1.52, 100.3, 5), (1.53, 100.4, 6)]
+    logs = []
+    stream = CountingFakeStream('BTCUSDT', ticks, speed=1, log_callback=logs.append)
+    exchange = SimulatedExchange(prices={'BTCUSDT': [99.0]}, balances={'USDT': 1000.0})
+    bot = TradingBot('BTCUSDT', 20.0, 0.02, 0.02, 0.05, None, None, 50, 4, log_callback=logs.append,
+                     price_stream=stream, stream_timeout=0.2, client=exchange)
+    thread = threading.Thread(target=bot.start, daemon=True)
+    thread.start()
+    try:
+        assert wait_until(lambda: stream.is_finished() and any("Stream recuperado" in m for m in logs))
+        assert wait_until(lambda: bot.last_price == 100.4)
+    finally:
+        bot.stop()
+        thread.join(5)
+    assert not thread.is_alive()
+    assert stream.gaps == 1
+    assert any("Hueco en el stream" in m for m in logs)
+    assert any("usando REST" in m for m in logs)  # Durante el silencio se sondeó por REST
+    assert stream.connects >= 2  # start y al menos una reconexión
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from quantize import StepScale
+
+
+@pytest.mark.parametrize('step', ['0.00000001', '0.00001', '0.01', '0.25', '1', '5'])
+def test_floor_batch_matches_floor_units(step):
+    scale = StepScale(step)
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 1000, 20000)
+    # Múltiplos exactos del paso escritos en decimal, y valores apenas por debajo y por arriba
+    multiples = np.array([float(scale.format(int(k) * scale.step_units)) for k in rng.integers(1, 10 ** 6, 5000)])
+    near = float(step) / 1000
+    values = np.concatenate([values, multiples, multiples - near, multiples + near, [0.29, 0.2999999999]])
+    expected = [scale.floor_units(value) for value in values]
+    assert scale.floor_batch(values).tolist() == expected
+
+
+def test_zero_step_is_rejected():
+    with pytest.raises(ValueError):
+        StepScale('0.00000000')
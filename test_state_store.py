@@ -0,0 +1,27 @@
+import sqlite3
+from state_store import StateStore
+
+
+def journal_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT symbol, last_buy_price, martingale_multiplier FROM journal ORDER BY seq").fetchall()
+    finally:
+        conn.close()
+
+
+def test_journal_is_compacted_on_close_and_reopen(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = StateStore(path)
+    for price in (100.0, 99.0, 98.0):
+        store.record('BTCUSDT', price, 2)
+    store.record('ETHUSDT', None, 1)
+    store.close()
+    assert journal_rows(path) == [('BTCUSDT', 98.0, 2), ('ETHUSDT', None, 1)]
+
+    store = StateStore(path)
+    assert store.restore('BTCUSDT') == (98.0, 2)
+    assert store.restore('ETHUSDT') == (None, 1)
+    store.record('BTCUSDT', 97.0, 4)
+    store.close()
+    assert journal_rows(path) == [('ETHUSDT', None, 1), ('BTCUSDT', 97.0, 4)]
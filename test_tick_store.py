@@ -0,0 +1,31 @@
+from tick_store import TickStore, TickRecorder
+from bot_logic import TradingBot
+from simulated_exchange import SimulatedExchange
+
+
+def test_load_keeps_ticks_at_start_in_previous_segment(tmp_path):
+    store = TickStore(str(tmp_path), segment_ticks=2)
+    store.append('BTCUSDT', [1000, 2000], [1.0, 2.0])
+    store.append('BTCUSDT', [2000, 3000], [3.0, 4.0])  # Segmento nuevo que empieza en 2000
+    assert [first for first, _ in store.segments('BTCUSDT')] == [1000, 2000]
+    timestamps, prices = store.load('BTCUSDT', start=2000)
+    assert list(timestamps) == [2000, 2000, 3000]
+    assert list(prices) == [2.0, 3.0, 4.0]
+
+
+def test_bot_flushes_recorded_ticks_when_it_stops(tmp_path):
+    store = TickStore(str(tmp_path))
+    recorder = TickRecorder(store, flush_ticks=1000, flush_interval=3600)
+    exchange = SimulatedExchange(prices={'BTCUSDT': [100.0]}, balances={'USDT': 1000.0})
+    bot = TradingBot('BTCUSDT', 20.0, 0.02, 0.02, 0.05, None, None, 10, 4, log_callback=lambda message: None,
+                     client=exchange, tick_recorder=recorder)
+    execute_trade = bot.execute_trade
+
+    def execute_once(current_price=None):
+        execute_trade(current_price)
+        bot.stop()
+
+    bot.execute_trade = execute_once
+    bot.start()
+    _, prices = store.load('BTCUSDT')
+    assert list(prices) == [100.0]
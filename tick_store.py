@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+import numpy as np
+
+# Cada segmento son dos columnas binarias crudas del mismo largo:
+# <inicio>.ts con timestamps en ms (int64) y <inicio>.px con precios (float64)
+TS_DTYPE = np.dtype('<i8')
+PX_DTYPE = np.dtype('<f8')
+
+
+class TickStore:
+    """Almacén columnar append-only de ticks, un directorio por símbolo con segmentos rotativos"""
+
+    def __init__(self, root="ticks", segment_ticks=1 << 20):
+        self.root = root
+        self.segment_ticks = segment_ticks  # Ticks por segmento antes de abrir uno nuevo
+        self.lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol.upper())
+
+    def symbols(self):
+        return sorted(d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d)))
+
+    def segments(self, symbol):
+        """Índice del símbolo: [(timestamp inicial, ruta sin extensión)] ordenado"""
+        path = self.symbol_dir(symbol)
+        if not os.path.isdir(path):
+            return []
+        starts = sorted(int(name[:-3]) for name in os.listdir(path) if name.endswith('.ts'))
+        return [(start, os.path.join(path, str(start))) for start in starts]
+
+    def segment_length(self, base):
+        # Si un corte dejó una columna más larga (o sin crear), solo cuentan las filas completas
+        sizes = [os.path.getsize(base + ext) if os.path.exists(base + ext) else 0 for ext in ('.ts', '.px')]
+        return min(sizes[0] // TS_DTYPE.itemsize, sizes[1] // PX_DTYPE.itemsize)
+
+    def append(self, symbol, timestamps, prices):
+        """Agrega ticks (timestamps en ms crecientes) al último segmento del símbolo"""
+        timestamps = np.asarray(timestamps, dtype=TS_DTYPE)
+        prices = np.asarray(prices, dtype=PX_DTYPE)
+        with self.lock:
+            os.makedirs(self.symbol_dir(symbol), exist_ok=True)
+            segments = self.segments(symbol)
+            i = 0
+            while i < len(timestamps):
+                first = int(timestamps[i])
+                base = segments[-1][1] if segments else None
+                used = self.segment_length(base) if base else 0
+                if base is None or (used >= self.segment_ticks and first > segments[-1][0]):
+                    base = os.path.join(self.symbol_dir(symbol), str(first))
+                    segments.append((first, base))
+                    used = 0
+                else:
+                    self.truncate(base, used)
+                # Si el tiempo no avanzó, el segmento lleno sigue creciendo para no repetir el nombre
+                chunk = slice(i, i + max(1, self.segment_ticks - used))
+                with open(base + '.ts', 'ab') as f:
+                    f.write(timestamps[chunk].tobytes())
+                with open(base + '.px', 'ab') as f:
+                    f.write(prices[chunk].tobytes())
+                i = chunk.stop
+
+    def truncate(self, base, length):
+        """Descarta filas incompletas antes de seguir escribiendo"""
+        for ext, dtype in (('.ts', TS_DTYPE), ('.px', PX_DTYPE)):
+            if os.path.exists(base + ext) and os.path.getsize(base + ext) != length * dtype.itemsize:
+                os.truncate(base + ext, length * dtype.itemsize)
+
+    def load(self, symbol, start=None, end=None):
+        """(timestamps, precios) del símbolo con start <= ts < end, leyendo solo los segmentos necesarios"""
+        segments = self.segments(symbol)
+        parts_ts, parts_px = [], []
+        for i, (first, base) in enumerate(segments):
+            if end is not None and first >= end:
+                break
+            # El segmento termina donde empieza el siguiente; si empieza justo en start, este
+            # todavía puede tener ticks con ese mismo timestamp (un segmento lleno sigue creciendo)
+            if start is not None and i + 1 < len(segments) and segments[i + 1][0] < start:
+                continue
+            length = self.segment_length(base)
+            if not length:
+                continue
+            ts = np.memmap(base + '.ts', dtype=TS_DTYPE, mode='r', shape=(length,))
+            lo = int(np.searchsorted(ts, start)) if start is not None else 0
+            hi = int(np.searchsorted(ts, end)) if end is not None else length
+            if hi > lo:
+                px = np.memmap(base + '.px', dtype=PX_DTYPE, mode='r', shape=(length,))
+                parts_ts.append(np.array(ts[lo:hi]))
+                parts_px.append(np.array(px[lo:hi]))
+        if not parts_ts:
+            return np.empty(0, dtype=TS_DTYPE), np.empty(0, dtype=PX_DTYPE)
+        return np.concatenate(parts_ts), np.concatenate(parts_px)
+
+    def load_many(self, symbols=None, start=None, end=None):
+        """{símbolo: (timestamps, precios)} para varios símbolos (todos si no se indican)"""
+        return {symbol.upper(): self.load(symbol, start, end) for symbol in (symbols or self.symbols())}
+
+
+class TickRecorder:
+    """Junta en memoria los ticks observados por los bots y los vuelca al TickStore por lotes"""
+
+    def __init__(self, store, flush_ticks=1000, flush_interval=5.0):
+        self.store = store
+        self.flush_ticks = flush_ticks
+        self.flush_interval = flush_interval  # Segundos máximos que un tick queda sin escribir
+        self.buffers = {}
+        self.count = 0
+        self.last_flush = time.monotonic()
+        self.last_ts = {}
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # Los lotes se escriben en el orden en que se tomaron
+
+    def record(self, symbol, price, timestamp=None):
+        """Registra un tick; timestamp en ms (por defecto, la hora local)"""
+        symbol = symbol.upper()
+        timestamp = int(timestamp if timestamp is not None else time.time() * 1000)
+        with self.lock:
+            # El lector busca por bisección: los timestamps de cada símbolo no pueden retroceder
+            timestamp = max(timestamp, self.last_ts.get(symbol, timestamp))
+            self.last_ts[symbol] = timestamp
+            self.buffers.setdefault(symbol, []).append((timestamp, price))
+            self.count += 1
+            due = self.count >= self.flush_ticks or time.monotonic() - self.last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                buffers, self.buffers = self.buffers, {}
+                self.count = 0
+                self.last_flush = time.monotonic()
+            for symbol, ticks in buffers.items():
+                timestamps, prices = zip(*ticks)
+                self.store.append(symbol, timestamps, prices)
+
+    def close(self):
+        self.flush()